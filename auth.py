@@ -9,6 +9,8 @@ Responsibilities:
 - Return (name, auth_status, username, authenticator) to the caller
 """
 
+from __future__ import annotations
+
 import yaml
 
 import streamlit as st
@@ -36,6 +38,24 @@ def save_config(config: dict, config_path: Path = DEFAULT_CONFIG_PATH) -> None:
     return
 
 
+def user_roles(config_path: Path = DEFAULT_CONFIG_PATH) -> list:
+    """
+    Roles of the logged user (credentials.usernames.<username>.roles in config.yaml).
+    Read once per login and kept in session_state: role changes apply on the next login.
+    """
+    username = st.session_state.get("username")
+    cached = st.session_state.get("_user_roles")
+    if cached is not None and cached[0] == username:
+        return cached[1]
+
+    config = load_config(config_path) or {}
+    user = config.get("credentials", {}).get("usernames", {}).get(username) or {}
+    roles = list(user.get("roles") or st.session_state.get("roles") or [])
+
+    st.session_state["_user_roles"] = (username, roles)
+    return roles
+
+
 def _build_authenticator(config: dict) -> stauth.Authenticate:
     return stauth.Authenticate(
         credentials=config["credentials"],
@@ -0,0 +1,101 @@
+"""
+Headless batch auto-audit: evaluate the automatic audit rules for every lead in a
+date range and store the resulting step decisions in bulk (no Streamlit).
+
+Usage: DB_URL=... python auto_audit.py --start 2025-01-01 --end 2025-06-30 [--chunk-days 7] [--workers 4]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.engine import Engine
+
+from db.factory import create_db_engine
+from services.audit_services import auto_audit_leads
+
+
+# One engine per worker process (engines must not cross a fork).
+_engine: Optional[Engine] = None
+
+
+def date_chunks(d_start: date, d_end: date, chunk_days: int) -> List[Tuple[date, date]]:
+    """
+    Split [d_start, d_end] into consecutive inclusive ranges of at most `chunk_days` days.
+    """
+    if chunk_days < 1:
+        raise ValueError(f"chunk_days must be >= 1, got {chunk_days}")
+
+    chunks = []
+    current = d_start
+    while current <= d_end:
+        chunk_end = min(current + timedelta(days=chunk_days - 1), d_end)
+        chunks.append((current, chunk_end))
+        current = chunk_end + timedelta(days=1)
+    return chunks
+
+
+def _init_worker() -> None:
+    global _engine
+    _engine = create_db_engine(pool_size=1, max_overflow=0)
+
+
+def _audit_chunk(d_start: date, d_end: date, batch_size: int) -> Tuple[date, date, Dict[str, int], float]:
+    t0 = time.perf_counter()
+    stats = auto_audit_leads(_engine, d_start=d_start, d_end=d_end, batch_size=batch_size)
+    return d_start, d_end, stats, time.perf_counter() - t0
+
+
+def run(d_start: date, d_end: date, *, chunk_days: int, workers: int, batch_size: int) -> Dict[str, int]:
+    chunks = date_chunks(d_start, d_end, chunk_days)
+    totals = {"leads": 0, "decisions": 0, "updated": 0}
+
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = [pool.submit(_audit_chunk, start, end, batch_size) for start, end in chunks]
+
+        for future in as_completed(futures):
+            start, end, stats, elapsed = future.result()
+            for key in totals:
+                totals[key] += stats[key]
+            print(
+                f"{start} → {end}: {stats['leads']} leads, {stats['decisions']} decisões, "
+                f"{stats['updated']} atualizadas ({elapsed:.1f}s)"
+            )
+
+    elapsed = time.perf_counter() - t0
+    rate = totals["leads"] / elapsed if elapsed > 0 else 0.0
+    print(
+        f"Total: {totals['leads']} leads em {len(chunks)} blocos, {totals['decisions']} decisões, "
+        f"{totals['updated']} atualizadas em {elapsed:.1f}s ({rate:.0f} leads/s)"
+    )
+    return totals
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--start", type=date.fromisoformat, required=True)
+    parser.add_argument("--end", type=date.fromisoformat, required=True)
+    parser.add_argument("--chunk-days", type=int, default=7)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    if args.end < args.start:
+        parser.error("--end must not be before --start")
+
+    run(
+        args.start,
+        args.end,
+        chunk_days=args.chunk_days,
+        workers=args.workers,
+        batch_size=args.batch_size,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+Local stand-in for the AddSales audit result endpoint (POST /planos/hzn/audit/result),
+with configurable latency, error rate and rate limit.
+
+Usage: python -m benchmarks.addsales_stand_in [--port 8765] [--latency-ms 200] [--jitter-ms 50]
+                                               [--error-rate 0.05] [--rate-limit 20]
+Point the app at it with ADDSALES_BASE_URL=http://127.0.0.1:8765
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from clients.addsales_client import UPDATE_LEAD_PATH
+
+
+@dataclass
+class StandInConfig:
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 503
+    fail_first: int = 0  # answer error_status to the first N requests (deterministic failures)
+    rate_limit: Optional[float] = None  # requests/s; above it answers 429
+    seed: Optional[int] = None
+
+
+@dataclass
+class StandInStats:
+    requests: int = 0
+    by_status: Dict[int, int] = field(default_factory=dict)
+    idempotency_keys: set = field(default_factory=set)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def record(self, status: int, idempotency_key: Optional[str]) -> None:
+        with self.lock:
+            self.requests += 1
+            self.by_status[status] = self.by_status.get(status, 0) + 1
+            if idempotency_key:
+                self.idempotency_keys.add(idempotency_key)
+
+
+class _TokenBucket:
+    def __init__(self, rate: float) -> None:
+        self.rate = rate
+        self.tokens = rate
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self) -> bool:
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, config: StandInConfig) -> None:
+        super().__init__(address, _Handler)
+        self.config = config
+        self.stats = StandInStats()
+        self.random = random.Random(config.seed)
+        self.random_lock = threading.Lock()
+        self.failures_left = config.fail_first
+        self.bucket = _TokenBucket(config.rate_limit) if config.rate_limit else None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def uniform(self) -> float:
+        with self.random_lock:
+            return self.random.random()
+
+    def take_forced_failure(self) -> bool:
+        with self.random_lock:
+            if self.failures_left <= 0:
+                return False
+            self.failures_left -= 1
+            return True
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: StandInServer
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+    def _reply(self, status: int, body: dict, headers: Optional[Dict[str, str]] = None) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+        self.server.stats.record(status, self.headers.get("Idempotency-Key"))
+
+    def do_POST(self) -> None:
+        config = self.server.config
+        url = urlsplit(self.path)
+        raw_body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+        if url.path != UPDATE_LEAD_PATH:
+            return self._reply(404, {"erro": "rota desconhecida"})
+        if not parse_qs(url.query).get("token"):
+            return self._reply(401, {"erro": "token ausente"})
+
+        if self.server.bucket is not None and not self.server.bucket.take():
+            return self._reply(429, {"erro": "limite de requisições"}, {"Retry-After": "1"})
+
+        delay_ms = config.latency_ms + config.jitter_ms * (2 * self.server.uniform() - 1)
+        time.sleep(max(delay_ms, 0) / 1000)
+
+        if self.server.take_forced_failure() or self.server.uniform() < config.error_rate:
+            return self._reply(config.error_status, {"erro": "falha simulada"})
+
+        try:
+            payload = json.loads(raw_body or b"{}")
+        except ValueError:
+            return self._reply(400, {"erro": "JSON inválido"})
+
+        self._reply(200, {"ok": True, "codigo_lead_addsales": payload.get("codigo_lead_addsales")})
+
+
+def serve(config: StandInConfig, host: str = "127.0.0.1", port: int = 0) -> StandInServer:
+    """
+    Start the stand-in on a background thread (port 0 picks a free port).
+    Call shutdown() on the returned server to stop it.
+    """
+    server = StandInServer((host, port), config)
+    threading.Thread(target=server.serve_forever, name="addsales-stand-in", daemon=True).start()
+    return server
+
+
+def add_config_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--fail-first", type=int, default=0, help="fail the first N requests")
+    parser.add_argument("--rate-limit", type=float, default=None, help="requests/s before answering 429")
+    parser.add_argument("--seed", type=int, default=None)
+
+
+def config_from_args(args: argparse.Namespace) -> StandInConfig:
+    return StandInConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        fail_first=args.fail_first,
+        rate_limit=args.rate_limit,
+        seed=args.seed,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    server = StandInServer((args.host, args.port), config_from_args(args))
+    print(f"AddSales stand-in em {server.base_url}{UPDATE_LEAD_PATH} (Ctrl+C para sair)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"{server.stats.requests} requisições: {server.stats.by_status}")
+
+
+if __name__ == "__main__":
+    main()
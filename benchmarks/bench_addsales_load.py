@@ -0,0 +1,162 @@
+"""
+Load test of clients.addsales_client.AddSalesClient: drives update_lead at target request
+rates (open loop) and reports throughput, latency percentiles and outcomes (successes,
+HTTP errors after retries, fast failures of the circuit breaker). Latencies count
+from each request's scheduled send time, so queueing in a saturated pool is included.
+
+Without --base-url an in-process stand-in (benchmarks.addsales_stand_in) is started
+with the given latency / error / rate-limit settings.
+
+Usage: python -m benchmarks.bench_addsales_load [--rates 5 20 50] [--duration 10]
+                                                [--latency-ms 200 --error-rate 0.05 --rate-limit 30]
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from benchmarks.addsales_stand_in import add_config_arguments, config_from_args, serve
+from clients.addsales_client import AddSalesClient, AddSalesError, AddSalesUnavailableError
+
+
+_STATUS_RE = re.compile(r"retornou (\d{3})")
+
+
+def _outcome(exc: Optional[Exception]) -> str:
+    if exc is None:
+        return "ok"
+    if isinstance(exc, AddSalesUnavailableError):
+        return "circuito aberto"
+    match = _STATUS_RE.search(str(exc))
+    return f"HTTP {match.group(1)}" if match else "erro de rede"
+
+
+def _call(client: AddSalesClient, index: int, scheduled: float) -> Tuple[float, str]:
+    """
+    Latency is measured from the scheduled send time, not from when a worker picks the
+    task up: queueing behind a saturated pool counts (no coordinated omission).
+    """
+    try:
+        client.update_lead(
+            token="stand-in",
+            addsales_code=str(index),
+            payload={"codigo_lead_addsales": index, "resultado_auditoria": "aprovado"},
+            headers={"Content-Type": "application/json", "Idempotency-Key": uuid.uuid4().hex},
+        )
+        exc = None
+    except AddSalesError as e:
+        exc = e
+    return time.perf_counter() - scheduled, _outcome(exc)
+
+
+def run_rate(client: AddSalesClient, rate: float, duration_s: float, concurrency: int) -> Dict[str, object]:
+    """
+    Send rate * duration_s requests on a fixed schedule (open loop, bounded by `concurrency`).
+    """
+    n_requests = max(int(rate * duration_s), 1)
+    results: List[Tuple[float, str]] = []
+    lock = threading.Lock()
+
+    def task(index: int, scheduled: float) -> None:
+        result = _call(client, index, scheduled)
+        with lock:
+            results.append(result)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for index in range(n_requests):
+            scheduled = t0 + index / rate
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(task, index, scheduled)
+    elapsed = time.perf_counter() - t0
+
+    latencies_ms = np.array([latency for latency, _ in results]) * 1000
+    return {
+        "target_rps": rate,
+        "requests": len(results),
+        "achieved_rps": len(results) / elapsed,
+        "p50_ms": float(np.percentile(latencies_ms, 50)),
+        "p95_ms": float(np.percentile(latencies_ms, 95)),
+        "p99_ms": float(np.percentile(latencies_ms, 99)),
+        "max_ms": float(latencies_ms.max()),
+        "outcomes": dict(Counter(outcome for _, outcome in results)),
+    }
+
+
+def run(
+    rates: List[float],
+    *,
+    duration_s: float,
+    concurrency: int,
+    base_url: str,
+    max_retries: int,
+    failure_threshold: int,
+) -> None:
+    print(f"{'rps':>6} {'sent':>6} {'got rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}  outcomes")
+
+    for rate in rates:
+        # Fresh client per rate: the breaker state must not leak between runs.
+        client = AddSalesClient(
+            base_url=base_url,
+            max_retries=max_retries,
+            pool_maxsize=concurrency,
+            failure_threshold=failure_threshold,
+        )
+        try:
+            report = run_rate(client, rate, duration_s, concurrency)
+        finally:
+            client.close()
+
+        outcomes = ", ".join(f"{name}: {count}" for name, count in sorted(report["outcomes"].items()))
+        print(
+            f"{rate:>6.0f} {report['requests']:>6} {report['achieved_rps']:>8.1f} "
+            f"{report['p50_ms']:>8.1f} {report['p95_ms']:>8.1f} {report['p99_ms']:>8.1f} "
+            f"{report['max_ms']:>8.1f}  {outcomes}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rates", type=float, nargs="+", default=[5, 20, 50])
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per rate")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--base-url", default=None, help="existing AddSales (stand-in) URL")
+    parser.add_argument("--max-retries", type=int, default=3)
+    parser.add_argument("--failure-threshold", type=int, default=5)
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.base_url
+    if base_url is None:
+        server = serve(config_from_args(args))
+        base_url = server.base_url
+
+    try:
+        run(
+            args.rates,
+            duration_s=args.duration,
+            concurrency=args.concurrency,
+            base_url=base_url,
+            max_retries=args.max_retries,
+            failure_threshold=args.failure_threshold,
+        )
+    finally:
+        if server is not None:
+            server.shutdown()
+            print(f"stand-in: {server.stats.requests} requisições, {server.stats.by_status}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Substring search over the lead list keys: linear str.contains scan vs NGramIndex.
+
+Usage: python -m benchmarks.bench_search_index [--sizes 10000 100000 1000000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import best_of, synthetic_names
+from services.lead_search_index import NGramIndex
+from services.lead_snapshot_service import fold_text
+
+
+QUERIES = {
+    "search_name": ["ma", "mari", "silva", "jose sant", "luiza gomes"],
+    "search_cpf": ["12", "123", "4567", "12345678"],
+    "search_cep": ["01", "0123", "20031050"],
+}
+
+
+def synthetic_keys(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    names = synthetic_names(rng, n_rows)
+    return pd.DataFrame(
+        {
+            "search_name": names.map(fold_text),
+            "search_cpf": pd.Series(rng.integers(0, 10**11, n_rows)).astype(str).str.zfill(11),
+            "search_cep": pd.Series(rng.integers(0, 10**8, n_rows)).astype(str).str.zfill(8),
+        }
+    )
+
+
+def run(sizes: list[int], repeat: int = 3) -> None:
+    print(f"{'rows':>9} {'column':<12} {'query':<12} {'hits':>8} {'scan ms':>9} {'index ms':>9} {'speedup':>8}")
+
+    for n_rows in sizes:
+        keys = synthetic_keys(n_rows)
+
+        for column, queries in QUERIES.items():
+            t0 = time.perf_counter()
+            index = NGramIndex(keys[column])
+            build_s = time.perf_counter() - t0
+            print(f"{n_rows:>9} {column:<12} {'(build)':<12} {'':>8} {'':>9} {build_s * 1000:>9.1f}")
+
+            for query in queries:
+                hits = int(index.search(query).size)
+                scan_s = best_of(lambda: keys[column].str.contains(query, regex=False).to_numpy().nonzero(), repeat)
+                index_s = best_of(lambda: index.search(query), repeat)
+                print(
+                    f"{n_rows:>9} {column:<12} {query:<12} {hits:>8} "
+                    f"{scan_s * 1000:>9.2f} {index_s * 1000:>9.2f} {scan_s / index_s:>7.1f}x"
+                )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    run(args.sizes, repeat=args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Serasa address history parsing: the old replace/split/strptime chain vs
+parse_registered_history on the legacy composite-array text and on the JSON arrays.
+
+Usage: python -m benchmarks.bench_serasa_history [--sizes 10 100 1000]
+"""
+
+from __future__ import annotations
+
+import argparse
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import STREETS, best_of
+from services.serasa_history_service import parse_registered_history
+
+
+def synthetic_history(n_rows: int, seed: int = 0, with_commas: bool = True) -> list:
+    rng = np.random.default_rng(seed)
+    sep = ", " if with_commas else " "
+    first_day = date(2005, 1, 1)
+    return [
+        {
+            "address": f"{rng.choice(STREETS)}{sep}{int(rng.integers(1, 3000))}{sep}Apto {int(rng.integers(1, 200))}",
+            "registered_dt": (first_day + timedelta(days=int(rng.integers(0, 7000)))).isoformat(),
+        }
+        for _ in range(n_rows)
+    ]
+
+
+def to_pg_text(history: list) -> str:
+    """
+    Postgres text output of a composite array ({"(\\"a, b\\",2020-01-01)",...}).
+    """
+    items = []
+    for item in history:
+        address = item["address"]
+        if "," in address:
+            address = f'\\"{address}\\"'
+        items.append(f'"({address},{item["registered_dt"]})"')
+    return "{" + ",".join(items) + "}"
+
+
+def legacy_parse(descricao_enderecos: str) -> pd.DataFrame:
+    # Former ui.tables.build_tabela_enderecos (breaks on commas inside addresses).
+    info_enderecos = descricao_enderecos.replace("{", "").replace("}", "")
+    info_enderecos = info_enderecos.split('","')
+    info_enderecos = [e.replace('"', "").replace("\\", "") for e in info_enderecos]
+
+    enderecos, register_data = [], []
+    for desc in info_enderecos:
+        endereco, reg_data = desc.replace("(", "").replace(")", "").split(",")
+        enderecos.append(endereco)
+        register_data.append(datetime.strptime(reg_data, "%Y-%m-%d"))
+
+    df = pd.DataFrame({"Endereço registrado": enderecos, "Data de registro": register_data})
+    return df.sort_values(by="Data de registro", ascending=False)
+
+
+def run(sizes: list[int], repeat: int = 5) -> None:
+    print(f"{'rows':>7} {'legacy ms':>10} {'text ms':>9} {'json ms':>9}")
+
+    for n_rows in sizes:
+        history = synthetic_history(n_rows)
+        plain_text = to_pg_text(synthetic_history(n_rows, with_commas=False))
+        text_value = to_pg_text(history)
+
+        parsed = parse_registered_history(text_value, "Endereço registrado")
+        assert sorted(parsed["Endereço registrado"]) == sorted(item["address"] for item in history)
+
+        legacy_s = best_of(lambda: legacy_parse(plain_text), repeat)
+        text_s = best_of(lambda: parse_registered_history(text_value, "Endereço registrado"), repeat)
+        json_s = best_of(lambda: parse_registered_history(history, "Endereço registrado"), repeat)
+        print(f"{n_rows:>7} {legacy_s * 1000:>10.2f} {text_s * 1000:>9.2f} {json_s * 1000:>9.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    run(args.sizes, repeat=args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Lead pipeline benchmark suite: times each stage of building the lead list on synthetic
+frames (benchmarks.synthetic) and writes machine-readable JSON, optionally compared
+against a stored baseline.
+
+Stages: fmt_leads_features, lead status (column-wise and row-wise define_lead_status),
+sort, search keys, the Nome/CPF/CEP filters (ui.components.leads_view._apply_leads_filter,
+plus the search on an already built index and a full scan for reference), the automatic
+audit rules and the Serasa address/phone tables (ui.tables, first render and cached).
+The KPI strip is not timed here: its counts come from SQL (lead_repo.fetch_lead_metrics).
+
+Outside `streamlit run` session_state does not persist between calls, so every
+_apply_leads_filter call is the first search of its snapshot (index build + search).
+
+Usage: python -m benchmarks.run_pipeline [--sizes 1000 10000 100000 1000000]
+                                         [--output benchmarks/results/latest.json]
+                                         [--baseline benchmarks/results/baseline.json]
+                                         [--save-baseline] [--threshold 1.25]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from streamlit import logger as streamlit_logger
+
+from benchmarks.synthetic import best_of, synthetic_leads
+from services.audit_rules import evaluate_audit_rules
+from services.lead_search_index import NGramIndex
+from services.lead_snapshot_service import add_search_keys, fold_text
+from services.lead_status_service import define_lead_status, define_lead_status_frame
+from ui.components.leads_view import _apply_leads_filter
+from ui.formatters import fmt_leads_features
+from ui.tables import _registered_history, build_tabela_enderecos, build_tabela_telefones
+
+
+RESULTS_DIR = Path(__file__).parent / "results"
+DEFAULT_OUTPUT = RESULTS_DIR / "latest.json"
+DEFAULT_BASELINE = RESULTS_DIR / "baseline.json"
+
+# stage name: (filter type as picked in the list, search key column, typed value)
+FILTER_QUERIES = {
+    "nome": ("Nome", "search_name", "maria silva"),
+    "cpf": ("CPF", "search_cpf", "1234"),
+    "cep": ("CEP", "search_cep", "0123"),
+}
+
+# Row-wise / per-lead stages are capped: they are per-lead work in the app.
+ROW_WISE_STATUS_MAX_ROWS = 100_000
+DETAIL_MAX_ROWS = 10_000
+TABLE_PARSER_LEADS = 200
+
+
+def _first_render(build_table, values: pd.Series) -> None:
+    # Drop the st.cache_data entries so every call parses again.
+    _registered_history.clear()
+    for value in values:
+        build_table(value)
+
+
+def run_size(n_rows: int, repeat: int, seed: int = 0) -> Dict[str, float]:
+    """
+    Seconds (best of `repeat`) per stage for `n_rows` leads.
+    """
+    timings: Dict[str, float] = {}
+    raw = synthetic_leads(n_rows, seed=seed)
+
+    # fmt_leads_features works in place: time it on fresh copies.
+    timings["fmt_leads_features"] = best_of(lambda: fmt_leads_features(raw.copy()), repeat)
+    df = fmt_leads_features(raw.copy())
+
+    timings["status_frame"] = best_of(lambda: define_lead_status_frame(df), repeat)
+    status_rows = df.head(ROW_WISE_STATUS_MAX_ROWS)
+    timings["status_row_wise"] = best_of(lambda: status_rows.apply(define_lead_status, axis=1), 1)
+    df["status"] = define_lead_status_frame(df)
+
+    timings["sort"] = best_of(lambda: df.sort_values("lead_dt", ascending=False), repeat)
+    df = df.sort_values("lead_dt", ascending=False)
+
+    timings["search_keys"] = best_of(lambda: add_search_keys(df.copy()), repeat)
+    add_search_keys(df)
+
+    for name, (filter_type, column, value) in FILTER_QUERIES.items():
+        timings[f"filter_{name}"] = best_of(lambda: _apply_leads_filter(df, filter_type, value), 1)
+        query = fold_text(value)
+        index = NGramIndex(df[column])
+        timings[f"filter_{name}_indexed"] = best_of(lambda: df.iloc[index.search(query)], repeat)
+        timings[f"filter_{name}_scan"] = best_of(
+            lambda: df[df[column].str.contains(query, regex=False)], repeat
+        )
+
+    detail = synthetic_leads(min(n_rows, DETAIL_MAX_ROWS), seed=seed, detail=True)
+    timings["audit_rules"] = best_of(lambda: evaluate_audit_rules(detail), repeat)
+
+    sample = detail.head(TABLE_PARSER_LEADS)
+    for name, build_table, column in (
+        ("table_addresses", build_tabela_enderecos, "all_addresses"),
+        ("table_phones", build_tabela_telefones, "all_phones"),
+    ):
+        timings[name] = best_of(lambda: _first_render(build_table, sample[column]), repeat)
+        timings[f"{name}_cached"] = best_of(lambda: [build_table(value) for value in sample[column]], repeat)
+    return timings
+
+
+def compare(results: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """
+    Print current vs baseline per stage; returns the regressions (slower than `threshold` x).
+    """
+    regressions = []
+    print(f"\n{'rows':>9} {'stage':<28} {'base ms':>10} {'now ms':>10} {'ratio':>7}")
+
+    for size, stages in results["results"].items():
+        base_stages = baseline.get("results", {}).get(size, {})
+        for stage, seconds in stages.items():
+            base = base_stages.get(stage)
+            if not base:
+                continue
+            ratio = seconds / base
+            flag = " <-- regressão" if ratio > threshold else ""
+            print(f"{size:>9} {stage:<28} {base * 1000:>10.2f} {seconds * 1000:>10.2f} {ratio:>6.2f}x{flag}")
+            if flag:
+                regressions.append(f"{size}/{stage}")
+
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="also store the results as the baseline")
+    parser.add_argument("--threshold", type=float, default=1.25, help="slowdown ratio reported as regression")
+    args = parser.parse_args()
+
+    # Outside `streamlit run` every st.* call of the UI helpers logs a warning.
+    streamlit_logger.set_log_level("error")
+
+    results = {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+        },
+        "results": {},
+    }
+
+    print(f"{'rows':>9} {'stage':<28} {'ms':>10}")
+    for n_rows in args.sizes:
+        timings = run_size(n_rows, args.repeat)
+        results["results"][str(n_rows)] = timings
+        for stage, seconds in timings.items():
+            print(f"{n_rows:>9} {stage:<28} {seconds * 1000:>10.2f}")
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(results, indent=2))
+    print(f"\nResultados em {args.output}")
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(results, indent=2))
+        print(f"Baseline salva em {args.baseline}")
+        return
+
+    baseline: Optional[Dict] = None
+    if args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regressões acima de {args.threshold:.2f}x")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
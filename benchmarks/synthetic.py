@@ -0,0 +1,166 @@
+"""
+Synthetic lead frames shaped like lead_repo output, and shared helpers, for the benchmarks.
+
+synthetic_leads(n) builds the slim list columns (fetch_lead_list); with detail=True
+it adds the heavy detail columns (fetch_lead_detail: serasa_json, cnpj_json,
+vtal_address, vtal_availability, all_addresses, all_phones, escavador fields).
+synthetic_names builds the random full names and best_of times a callable.
+"""
+
+from __future__ import annotations
+
+import time
+from datetime import date, timedelta
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+
+FIRST_NAMES = ["Maria", "José", "Ana", "João", "Antônio", "Francisca", "Carlos", "Mariana", "Luíza", "Paulo"]
+LAST_NAMES = ["Silva", "Santos", "Oliveira", "Souza", "Rodrigues", "Ferreira", "Alves", "Pereira", "Lima", "Gomes"]
+STREETS = ["Rua das Flores", "Avenida Brasil", "Rua Sete de Setembro", "Travessa São José", "Alameda Santos"]
+
+AUDIT_STEPS = (
+    "address_info",
+    "biometrics",
+    "consumer_doc",
+    "corp_doc",
+    "court_case",
+    "informais",
+    "serasa",
+    "serpro",
+    "vtal_client",
+    "vtal_qty_hc",
+    "street_view",
+)
+
+
+def best_of(fn: Callable[[], object], repeat: int) -> float:
+    """
+    Best wall time in seconds of `repeat` calls of `fn`.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def synthetic_names(rng: np.random.Generator, n_rows: int) -> pd.Series:
+    return (
+        pd.Series(rng.choice(FIRST_NAMES, n_rows))
+        + " "
+        + pd.Series(rng.choice(LAST_NAMES, n_rows))
+        + " "
+        + pd.Series(rng.choice(LAST_NAMES, n_rows))
+    )
+
+
+def _digits(rng: np.random.Generator, n_rows: int, width: int) -> pd.Series:
+    return pd.Series(rng.integers(0, 10**width, n_rows)).astype(str).str.zfill(width)
+
+
+def _with_nulls(rng: np.random.Generator, s: pd.Series, rate: float) -> pd.Series:
+    return s.astype(object).where(rng.random(len(s)) >= rate, None)
+
+
+def synthetic_leads(n_rows: int, seed: int = 0, detail: bool = False, history_size: int = 20) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    today = pd.Timestamp(date.today())
+
+    names = synthetic_names(rng, n_rows)
+    hzn_audit = rng.random(n_rows) < 0.4
+    final_result = pd.Series(rng.choice(["aprovado", "pendente", "reprovado"], n_rows), dtype=object)
+    final_result = final_result.where(hzn_audit & (rng.random(n_rows) < 0.5), None)
+
+    df = pd.DataFrame(
+        {
+            "lead_id": [f"lead-{i:08d}" for i in range(n_rows)],
+            "lead_dt": today - pd.to_timedelta(rng.integers(0, 365 * 24 * 60, n_rows), unit="min"),
+            "name": _with_nulls(rng, names, 0.05),
+            "cpf": _with_nulls(rng, _digits(rng, n_rows, 11), 0.01),
+            "cnpj": _with_nulls(rng, _digits(rng, n_rows, 14), 0.7),
+            "mothersname": _with_nulls(rng, names.sample(frac=1, random_state=seed).reset_index(drop=True), 0.2),
+            "birth_dt": today - pd.to_timedelta(rng.integers(18 * 365, 80 * 365, n_rows), unit="D"),
+            "homeativo_status": rng.choice(["Venda aprovada", "Reprovado", "Em negociação"], n_rows),
+            "hzn_audit": hzn_audit,
+            "hzn_final_result": final_result,
+            "hzn_final_result_dt": today,
+            "hzn_pending": None,
+            "hzn_denied": None,
+            "vtal_zip_code": _digits(rng, n_rows, 8),
+            "vtal_number": pd.Series(rng.integers(1, 3000, n_rows)).astype(str),
+            "row_updated_at": today,
+        }
+    )
+    # Slim serasa_json (registration only), used by fmt_leads_features for leads without name.
+    df["serasa_json"] = [
+        None if name is not None else {
+            "registration": {"consumerName": full_name, "motherName": None, "birthDate": "1980-01-01"}
+        }
+        for name, full_name in zip(df["name"], names)
+    ]
+
+    for step in AUDIT_STEPS:
+        result = pd.Series(rng.choice(["aprovado", "pendente", "reprovado"], n_rows), dtype=object)
+        df[f"hzn_{step}_result"] = result.where(rng.random(n_rows) < 0.3, None)
+        df[f"hzn_{step}_dt"] = today
+
+    if detail:
+        _add_detail_columns(df, rng, history_size)
+    return df
+
+
+def _history(rng: np.random.Generator, size: int, make_value) -> list:
+    first_day = date(2005, 1, 1)
+    return [
+        {"value": make_value(), "registered_dt": (first_day + timedelta(days=int(day))).isoformat()}
+        for day in rng.integers(0, 7000, size)
+    ]
+
+
+def _add_detail_columns(df: pd.DataFrame, rng: np.random.Generator, history_size: int) -> None:
+    n_rows = len(df)
+    balances = np.where(rng.random(n_rows) < 0.3, rng.integers(0, 5000, n_rows), 0)
+    opened = pd.Timestamp(date.today()) - pd.to_timedelta(rng.integers(0, 3000, n_rows), unit="D")
+
+    df["statusregistration"] = rng.choice(["REGULAR", "REGULAR", "REGULAR", "SUSPENSA"], n_rows)
+    df["credit_score"] = rng.integers(0, 1000, n_rows)
+    df["serasa_json"] = [
+        {
+            "registration": {"consumerName": name, "motherName": None, "birthDate": "1980-01-01"},
+            "negativeData": {
+                "pefin": {"summary": {"balance": int(balance)}, "pefinResponse": []},
+                "notary": {"summary": {"balance": 0}},
+            },
+        }
+        for name, balance in zip(df["name"], balances)
+    ]
+    df["active_cases_as_defendant"] = rng.poisson(1.5, n_rows)
+    df["active_criminal_cases"] = [[] if r >= 0.05 else [{"numero": "0000"}] for r in rng.random(n_rows)]
+    df["doc_situation"] = df["cnpj"].map(lambda cnpj: None if cnpj is None else "ATIVA")
+    df["cnpj_json"] = [
+        None if cnpj is None else {
+            "descricao_situacao_cadastral": "ATIVA" if r >= 0.1 else "BAIXADA",
+            "data_inicio_atividade": day.strftime("%Y-%m-%d"),
+        }
+        for cnpj, r, day in zip(df["cnpj"], rng.random(n_rows), opened)
+    ]
+    df["vtal_address"] = [
+        {"address": {"zipCode": zip_code, "number": number, "city": "São Paulo", "state": "SP"}}
+        for zip_code, number in zip(df["vtal_zip_code"], df["vtal_number"])
+    ]
+    df["vtal_availability"] = [
+        {"resource": {"availabilityCode": int(code), "inventoryId": "inv"}}
+        for code in rng.choice([1, 1, 1, 2], n_rows)
+    ]
+    df["all_addresses"] = [
+        _history(rng, history_size, lambda: f"{rng.choice(STREETS)}, {int(rng.integers(1, 3000))}, São Paulo")
+        for _ in range(n_rows)
+    ]
+    df["all_phones"] = [
+        _history(rng, max(history_size // 4, 1), lambda: f"11{int(rng.integers(10**8, 10**9))}")
+        for _ in range(n_rows)
+    ]
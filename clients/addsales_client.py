@@ -1,9 +1,24 @@
 from __future__ import annotations
 
+import os
+import threading
+import time
 from dataclasses import dataclass
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple, Union
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+DEFAULT_BASE_URL = "https://facilito.promo"
+# Override (e.g. the local stand-in, benchmarks/addsales_stand_in.py) with ADDSALES_BASE_URL.
+BASE_URL_ENV = "ADDSALES_BASE_URL"
+UPDATE_LEAD_PATH = "/planos/hzn/audit/result"
+
+# 5xx/429 answers and connection errors worth retrying: the audit result update is
+# idempotent (same lead, same payload), so a replayed POST is safe.
+RETRY_STATUSES = (429, 500, 502, 503, 504)
 
 
 @dataclass(frozen=True)
@@ -13,7 +28,170 @@ class AddSalesResponse:
 
 
 class AddSalesError(RuntimeError):
-    pass
+    """
+    `status_code` is the HTTP status AddSales answered, None when no answer was received.
+    """
+
+    def __init__(self, message: str, status_code: Optional[int] = None) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class AddSalesUnavailableError(AddSalesError):
+    """
+    Raised without calling AddSales while the circuit breaker is open.
+    """
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker (thread-safe).
+
+    After `failure_threshold` failures in a row the circuit opens and calls fail fast;
+    once `reset_timeout_s` has passed one trial call is let through (half-open),
+    which closes the circuit on success or opens it again on failure.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout_s: float = 30.0) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_s = reset_timeout_s
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_timeout_s:
+                return "half-open"
+            return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_timeout_s or self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+
+class AddSalesClient:
+    """
+    AddSales HTTP client: keep-alive session with a connection pool, bounded retries
+    with exponential backoff and a circuit breaker. Safe to share between threads.
+    """
+
+    def __init__(
+        self,
+        *,
+        base_url: str = DEFAULT_BASE_URL,
+        timeout_s: Union[float, Tuple[float, float]] = (3.05, 10),
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        pool_maxsize: int = 10,
+        failure_threshold: int = 5,
+        reset_timeout_s: float = 30.0,
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.timeout_s = timeout_s
+        self.breaker = CircuitBreaker(failure_threshold=failure_threshold, reset_timeout_s=reset_timeout_s)
+
+        retry = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=max_retries,
+            status=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset({"POST"}),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def close(self) -> None:
+        self.session.close()
+
+    def update_lead(
+        self,
+        *,
+        token: str,
+        addsales_code: str,
+        payload: Dict[str, Any],
+        timeout_s: Optional[Union[float, Tuple[float, float]]] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> AddSalesResponse:
+        """
+        Send the audit result of one lead.
+        Behavior: raises on non-2xx (after retries) to make failures explicit.
+        """
+        if not token:
+            raise AddSalesError("token vazio")
+        if not addsales_code:
+            raise AddSalesError("addsales_code vazio")
+
+        if not self.breaker.allow():
+            raise AddSalesUnavailableError("AddSales indisponível (circuito aberto após falhas seguidas)")
+
+        try:
+            r = self.session.post(
+                f"{self.base_url}{UPDATE_LEAD_PATH}",
+                params={"token": token},
+                headers=headers or {"Content-Type": "application/json"},
+                json=payload,
+                timeout=timeout_s or self.timeout_s,
+            )
+        except requests.RequestException as e:
+            self.breaker.record_failure()
+            raise AddSalesError(f"falha HTTP AddSales: {e}") from e
+
+        if r.status_code in RETRY_STATUSES:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+
+        if not (200 <= r.status_code < 300):
+            msg = f"AddSales retornou {r.status_code}: {r.text}"
+            raise AddSalesError(msg, status_code=r.status_code)
+
+        return AddSalesResponse(status_code=r.status_code, body_text=r.text)
+
+
+_default_client: Optional[AddSalesClient] = None
+_default_client_lock = threading.Lock()
+
+
+def get_client() -> AddSalesClient:
+    """
+    Process-wide AddSalesClient (one connection pool shared by every session),
+    pointed at ADDSALES_BASE_URL when set.
+    """
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = AddSalesClient(base_url=os.getenv(BASE_URL_ENV) or DEFAULT_BASE_URL)
+        return _default_client
 
 
 def update_lead(
@@ -21,34 +199,16 @@ def update_lead(
     token: str,
     addsales_code: str,
     payload: Dict[str, Any],
-    timeout_s: int = 20,
+    timeout_s: Optional[Union[float, Tuple[float, float]]] = None,
     headers: Optional[Dict[str, str]] = None,
 ) -> AddSalesResponse:
     """
-    Minimal HTTP client for AddSales update.
-    Behavior: raises on non-2xx to make failures explicit.
+    update_lead through the shared client (see AddSalesClient.update_lead).
     """
-    if not token:
-        raise AddSalesError("token vazio")
-    if not addsales_code:
-        raise AddSalesError("addsales_code vazio")
-
-    url = f"https://facilito.promo/planos/hzn/audit/result?token={token}"
-
-    headers = headers or {"Content-Type": "application/json"}
-
-    try:
-        r = requests.post(
-            url,
-            headers=headers,
-            json=payload,
-            timeout=timeout_s,
-        )
-    except requests.RequestException as e:
-        raise AddSalesError(f"falha HTTP AddSales: {e}") from e
-
-    if not (200 <= r.status_code < 300):
-        msg = f"AddSales retornou {r.status_code}: {r.text}"
-        raise AddSalesError(msg)
-
-    return AddSalesResponse(status_code=r.status_code, body_text=r.text)
+    return get_client().update_lead(
+        token=token,
+        addsales_code=addsales_code,
+        payload=payload,
+        timeout_s=timeout_s,
+        headers=headers,
+    )
@@ -2,10 +2,13 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from datetime import date
-from typing import Optional, Tuple
+from typing import Any, Dict, Optional, Tuple
 
+import pandas as pd
 import streamlit as st
 
+from services.lead_snapshot_service import lead_positions, patch_lead_row
+
 
 @dataclass(frozen=True)
 class LeadsQuery:
@@ -27,16 +30,86 @@ def init_session_state() -> None:
     st.session_state.setdefault("leads_data_version", 0)
     st.session_state.setdefault("_leads_query", None)
     st.session_state.setdefault("df_leads", None)
+    st.session_state.setdefault("leads_watermark", None)
+    st.session_state.setdefault("_leads_patched", False)
+    st.session_state.setdefault("leads_patch_version", 0)
 
 
 def bump_leads_version() -> None:
     """
-    Invalidate the current leads snapshot.
+    Mark the current leads snapshot as stale.
+    The next load only fetches leads changed since the snapshot watermark.
     """
     st.session_state["leads_data_version"] = (
         int(st.session_state.get("leads_data_version", 0)) + 1
     )
+
+
+def reset_leads_snapshot() -> None:
+    """
+    Drop the current leads snapshot, forcing a full reload.
+    """
+    bump_leads_version()
     st.session_state["_leads_query"] = None
+    st.session_state["df_leads"] = None
+    st.session_state["leads_watermark"] = None
+
+
+def get_snapshot_cache(df: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Data derived from one leads snapshot object (search indexes, lead_id
+    positions, per-lead records); dropped when the snapshot object changes.
+    """
+    cache = st.session_state.get("_leads_snapshot_cache")
+    if cache is None or cache["frame"] is not df:
+        cache = {"frame": df}
+        st.session_state["_leads_snapshot_cache"] = cache
+    return cache
+
+
+def get_lead_position(df: pd.DataFrame, lead_id: Any) -> Optional[int]:
+    """
+    Row position of a lead in the snapshot (lead_id -> position index built once).
+    """
+    cache = get_snapshot_cache(df)
+    if "positions" not in cache:
+        cache["positions"] = lead_positions(df)
+    return cache["positions"].get(lead_id)
+
+
+def get_lead_record(df: pd.DataFrame, lead_id: Any) -> Optional[Dict[str, Any]]:
+    """
+    Cached dict of one snapshot row; patches drop the lead's entry.
+    """
+    records = get_snapshot_cache(df).setdefault("records", {})
+    if lead_id not in records:
+        position = get_lead_position(df, lead_id)
+        if position is None:
+            return None
+        records[lead_id] = df.iloc[position].to_dict()
+    return records[lead_id]
+
+
+def patch_leads_snapshot(lead_id: str, values: Optional[Dict[str, Any]]) -> None:
+    """
+    Apply an audit write to the session's leads snapshot without reloading it.
+    Falls back to invalidating the snapshot when the row cannot be patched.
+    """
+    df_leads = st.session_state.get("df_leads")
+    position = get_lead_position(df_leads, lead_id) if df_leads is not None else None
+
+    if not values or position is None:
+        bump_leads_version()
+        return
+
+    patch_lead_row(df_leads, position, values)
+    get_snapshot_cache(df_leads).get("records", {}).pop(lead_id, None)
+
+    # Cached snapshots of this version no longer match the database.
+    st.session_state["_leads_patched"] = True
+    st.session_state["leads_patch_version"] = (
+        int(st.session_state.get("leads_patch_version", 0)) + 1
+    )
 
 
 def get_leads_query(start: date, end: date) -> LeadsQuery:
@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import functools
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional
+
+import numpy as np
+import streamlit as st
+
+
+# Most recent durations kept per span name for the percentiles.
+SAMPLE_SIZE = 512
+# Reruns slower than this are kept (with their slowest spans) for the admin panel.
+SLOW_RERUN_S = 1.0
+SLOW_RERUNS_KEPT = 20
+
+RERUN_SPAN = "rerun"
+
+_SESSION_REGISTRY_KEY = "_timing_registry"
+_SESSION_RERUN_KEY = "_timing_rerun"
+
+
+class TimingRegistry:
+    """
+    Thread-safe aggregation of span durations by name (count, p50, p95, max)
+    plus the most recent slow reruns.
+    """
+
+    def __init__(self) -> None:
+        self._samples: Dict[str, Deque[float]] = {}
+        self._counts: Dict[str, int] = {}
+        self._maxima: Dict[str, float] = {}
+        self._totals: Dict[str, float] = {}
+        self.slow_reruns: Deque[Dict[str, Any]] = deque(maxlen=SLOW_RERUNS_KEPT)
+        self._lock = threading.Lock()
+
+    def record(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self._samples.setdefault(name, deque(maxlen=SAMPLE_SIZE)).append(seconds)
+            self._counts[name] = self._counts.get(name, 0) + 1
+            self._maxima[name] = max(self._maxima.get(name, 0.0), seconds)
+            self._totals[name] = self._totals.get(name, 0.0) + seconds
+
+    def record_slow_rerun(self, rerun: Dict[str, Any]) -> None:
+        with self._lock:
+            self.slow_reruns.appendleft(rerun)
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """
+        One row per span name, hottest (largest total time) first. Times in ms.
+        """
+        with self._lock:
+            rows = []
+            for name, samples in self._samples.items():
+                p50, p95 = np.percentile(np.fromiter(samples, dtype=float), [50, 95])
+                rows.append(
+                    {
+                        "span": name,
+                        "count": self._counts[name],
+                        "total_ms": self._totals[name] * 1000,
+                        "p50_ms": p50 * 1000,
+                        "p95_ms": p95 * 1000,
+                        "max_ms": self._maxima[name] * 1000,
+                    }
+                )
+
+        return sorted(rows, key=lambda row: row["total_ms"], reverse=True)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+            self._maxima.clear()
+            self._totals.clear()
+            self.slow_reruns.clear()
+
+
+# Shared by every session of this server process.
+_process_registry = TimingRegistry()
+
+
+def process_registry() -> TimingRegistry:
+    return _process_registry
+
+
+def session_registry() -> TimingRegistry:
+    registry = st.session_state.get(_SESSION_REGISTRY_KEY)
+    if registry is None:
+        registry = st.session_state[_SESSION_REGISTRY_KEY] = TimingRegistry()
+    return registry
+
+
+def _record(name: str, seconds: float) -> None:
+    _process_registry.record(name, seconds)
+    session_registry().record(name, seconds)
+
+    rerun = st.session_state.get(_SESSION_RERUN_KEY)
+    if rerun is not None:
+        rerun["spans"].append((name, seconds))
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """
+    Time the enclosed block under `name` (session and process aggregates).
+    Nested spans are recorded separately: a parent includes its children.
+    """
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        _record(name, time.perf_counter() - t0)
+
+
+@contextmanager
+def timed_expander(title: str, **expander_kwargs: Any) -> Iterator[None]:
+    """
+    st.expander whose content is timed as a span named after its title.
+    """
+    with st.expander(title, **expander_kwargs), span(title):
+        yield
+
+
+def timed(name: Optional[str] = None) -> Callable:
+    """
+    Decorator form of span (defaults to the function name).
+    """
+    def decorator(fn: Callable) -> Callable:
+        span_name = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def start_rerun() -> None:
+    """
+    Mark the start of a script run (call at the top of the page).
+    """
+    st.session_state[_SESSION_RERUN_KEY] = {"started": time.perf_counter(), "spans": []}
+
+
+def finish_rerun(user: Optional[str] = None) -> None:
+    """
+    Record the script run started by start_rerun; slow runs are kept with their
+    slowest spans.
+    """
+    rerun = st.session_state.pop(_SESSION_RERUN_KEY, None)
+    if rerun is None:
+        return
+
+    total = time.perf_counter() - rerun["started"]
+    _record(RERUN_SPAN, total)
+    if total < SLOW_RERUN_S:
+        return
+
+    slowest = sorted(rerun["spans"], key=lambda item: item[1], reverse=True)[:5]
+    slow_rerun = {
+        "at": datetime.now().strftime("%d/%m %H:%M:%S"),
+        "user": user,
+        "total_ms": total * 1000,
+        "slowest": ", ".join(f"{name} ({seconds * 1000:.0f} ms)" for name, seconds in slowest),
+    }
+    _process_registry.record_slow_rerun(slow_rerun)
+    session_registry().record_slow_rerun(slow_rerun)
+
+
+@contextmanager
+def timed_rerun(user: Optional[str] = None) -> Iterator[None]:
+    """
+    start_rerun / finish_rerun around the page body. Runs cut short by st.rerun()
+    (or an error) are recorded too: st.rerun() raises, and the finish runs in `finally`.
+    """
+    start_rerun()
+    try:
+        yield
+    finally:
+        finish_rerun(user=user)
@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+import os
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+
+
+def create_db_engine(env: str = "local", **engine_kwargs) -> Engine:
+    """
+    Build a SQLAlchemy engine from DB_URL (no Streamlit import).
+    The app caches it through db.engine.get_engine; scripts call this directly.
+    """
+    if env != "local":
+        raise ValueError(f"Unsupported env: {env!r}")
+
+    db_url = os.getenv("DB_URL")
+    if not db_url:
+        raise RuntimeError("DB_URL not found in environment")
+
+    engine_kwargs.setdefault("pool_pre_ping", True)
+    return create_engine(db_url, **engine_kwargs)
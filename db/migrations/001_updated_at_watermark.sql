@@ -0,0 +1,38 @@
+-- Modification timestamps used as the high-water mark of the incremental
+-- leads refresh (see lead_repo.fetch_lead_list_changed_since).
+
+CREATE OR REPLACE FUNCTION set_updated_at() RETURNS trigger AS $$
+BEGIN
+    NEW.updated_at := NOW();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+
+ALTER TABLE "lead" ADD COLUMN IF NOT EXISTS updated_at timestamptz NOT NULL DEFAULT NOW();
+CREATE INDEX IF NOT EXISTS lead_updated_at_idx ON "lead" (updated_at);
+DROP TRIGGER IF EXISTS lead_set_updated_at ON "lead";
+CREATE TRIGGER lead_set_updated_at
+    BEFORE UPDATE ON "lead"
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+
+ALTER TABLE serasa_api_results ADD COLUMN IF NOT EXISTS updated_at timestamptz NOT NULL DEFAULT NOW();
+CREATE INDEX IF NOT EXISTS serasa_api_results_updated_at_idx ON serasa_api_results (updated_at);
+DROP TRIGGER IF EXISTS serasa_api_results_set_updated_at ON serasa_api_results;
+CREATE TRIGGER serasa_api_results_set_updated_at
+    BEFORE UPDATE ON serasa_api_results
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+
+ALTER TABLE escavador_api_results ADD COLUMN IF NOT EXISTS updated_at timestamptz NOT NULL DEFAULT NOW();
+CREATE INDEX IF NOT EXISTS escavador_api_results_updated_at_idx ON escavador_api_results (updated_at);
+DROP TRIGGER IF EXISTS escavador_api_results_set_updated_at ON escavador_api_results;
+CREATE TRIGGER escavador_api_results_set_updated_at
+    BEFORE UPDATE ON escavador_api_results
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+
+ALTER TABLE company_situation_api_results ADD COLUMN IF NOT EXISTS updated_at timestamptz NOT NULL DEFAULT NOW();
+CREATE INDEX IF NOT EXISTS company_situation_api_results_updated_at_idx ON company_situation_api_results (updated_at);
+DROP TRIGGER IF EXISTS company_situation_api_results_set_updated_at ON company_situation_api_results;
+CREATE TRIGGER company_situation_api_results_set_updated_at
+    BEFORE UPDATE ON company_situation_api_results
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
@@ -0,0 +1,3 @@
+-- Keyset pagination of the lead list (see lead_repo.fetch_lead_page).
+
+CREATE INDEX IF NOT EXISTS lead_dt_lead_id_idx ON "lead" (lead_dt DESC, lead_id DESC);
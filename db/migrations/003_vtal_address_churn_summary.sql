@@ -0,0 +1,34 @@
+-- Per-address V.Tal HC summary behind the "Cliente V.Tal" verdicts
+-- (see vtal_repo.fetch_vtal_churn_summaries). The 24-month window is applied at
+-- read time on the latest pickup dates, so a stale refresh never widens it.
+-- Refresh with: python refresh_vtal_summary.py (REFRESH ... CONCURRENTLY).
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS vtal_address_churn_summary AS
+WITH hc AS (
+    SELECT
+        vhc.zip,
+        vhc.number,
+        vcl.status,
+        vcl.churn_type,
+        NULLIF(TRIM(vhc.pickup_dt::text), '')::date AS pickup_dt,
+        NULLIF(REGEXP_REPLACE(vhc.churn_month::text, '\D', '', 'g'), '')::int AS churn_month
+    FROM vtal_homeconnection_v2 vhc
+        JOIN vtal_customer_life_v2 vcl ON vhc.hc = vcl.hc
+    WHERE vhc.zip IS NOT NULL AND vhc.number IS NOT NULL
+)
+SELECT
+    zip,
+    number,
+    COUNT(*) AS hc_count,
+    COUNT(*) FILTER (WHERE status = 'hc_ativo') AS active_hc_count,
+    COUNT(*) FILTER (WHERE churn_type = 'voluntario') AS vol_churn_count,
+    COUNT(*) FILTER (WHERE churn_type = 'involuntario') AS invol_churn_count,
+    MAX(pickup_dt) FILTER (WHERE churn_type = 'voluntario' AND churn_month <= 3) AS last_vol_churn_3m_pickup_dt,
+    MAX(pickup_dt) FILTER (WHERE churn_type = 'involuntario' AND churn_month <= 6) AS last_invol_churn_6m_pickup_dt,
+    NOW() AS refreshed_at
+FROM hc
+GROUP BY zip, number;
+
+-- Unique index: lookup by address and required by REFRESH ... CONCURRENTLY.
+CREATE UNIQUE INDEX IF NOT EXISTS vtal_address_churn_summary_zip_number_idx
+    ON vtal_address_churn_summary (zip, number);
@@ -0,0 +1,35 @@
+-- Outbox of AddSales audit submissions (see db/repos/outbox_repo.py).
+-- The final decision and its message are written in one transaction; the
+-- background sender (services/addsales_outbox.py) delivers pending messages.
+
+CREATE TABLE IF NOT EXISTS addsales_outbox (
+    outbox_id bigserial PRIMARY KEY,
+    idempotency_key text NOT NULL UNIQUE,
+    lead_id text NOT NULL,
+    addsales_code text NOT NULL,
+    payload jsonb NOT NULL,
+    status text NOT NULL DEFAULT 'pending'
+        CHECK (status IN ('pending', 'sending', 'sent', 'failed', 'superseded')),
+    attempts integer NOT NULL DEFAULT 0,
+    next_attempt_at timestamptz NOT NULL DEFAULT NOW(),
+    locked_until timestamptz,
+    last_error text,
+    response_status integer,
+    created_at timestamptz NOT NULL DEFAULT NOW(),
+    sent_at timestamptz,
+    updated_at timestamptz NOT NULL DEFAULT NOW()
+);
+
+-- Claim queue: only undelivered messages are indexed.
+CREATE INDEX IF NOT EXISTS addsales_outbox_due_idx
+    ON addsales_outbox (next_attempt_at)
+    WHERE status IN ('pending', 'sending');
+
+-- Latest submission of a lead (delivery state in the UI).
+CREATE INDEX IF NOT EXISTS addsales_outbox_lead_idx
+    ON addsales_outbox (lead_id, created_at DESC);
+
+DROP TRIGGER IF EXISTS addsales_outbox_set_updated_at ON addsales_outbox;
+CREATE TRIGGER addsales_outbox_set_updated_at
+    BEFORE UPDATE ON addsales_outbox
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
@@ -0,0 +1,3 @@
+-- Accent-insensitive Nome filter of the server-side lead list (see lead_repo.fetch_lead_page).
+
+CREATE EXTENSION IF NOT EXISTS unaccent;
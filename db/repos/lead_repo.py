@@ -1,37 +1,168 @@
 from __future__ import annotations
 
-from datetime import date
-from typing import Optional
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
 
 import pandas as pd
 from sqlalchemy import text
 from sqlalchemy.engine import Engine
 
+from db.repos import outbox_repo
+
+
+_LEAD_JOINS = """
+    FROM "lead" l
+        LEFT JOIN serasa_api_results sar ON l.cpf = sar.documentnumber
+        LEFT JOIN escavador_api_results ear ON l.cpf = ear.cpf_cnpj
+        LEFT JOIN company_situation_api_results csar ON l.cnpj = csar.document
+"""
+
+_LEADS_SELECT = """
+    SELECT
+        l.*,
+        sar.statusregistration,
+        sar.credit_score,
+        to_json(sar.all_addresses) AS all_addresses,
+        to_json(sar.all_phones) AS all_phones,
+        sar.stolen_documents,
+        sar.renda_estimada,
+        sar.raw_json AS serasa_json,
+        ear.active_cases_as_defendant,
+        ear.active_criminal_cases,
+        csar.doc_situation,
+        csar.activity_start_date,
+        csar.raw_json AS cnpj_json,
+        GREATEST(l.updated_at, sar.updated_at, ear.updated_at, csar.updated_at) AS row_updated_at
+""" + _LEAD_JOINS
+
+
+_LEAD_LIST_COLUMNS = """
+        l.lead_id,
+        l.lead_dt,
+        l.name,
+        l.cpf,
+        l.cnpj,
+        l.mothersname,
+        l.birth_dt,
+        l.homeativo_status,
+        l.hzn_audit,
+        l.hzn_final_result,
+        l.hzn_final_result_dt,
+        l.hzn_pending,
+        l.hzn_denied,
+        l.hzn_address_info_result, l.hzn_address_info_dt,
+        l.hzn_biometrics_result, l.hzn_biometrics_dt,
+        l.hzn_consumer_doc_result, l.hzn_consumer_doc_dt,
+        l.hzn_corp_doc_result, l.hzn_corp_doc_dt,
+        l.hzn_court_case_result, l.hzn_court_case_dt,
+        l.hzn_informais_result, l.hzn_informais_dt,
+        l.hzn_serasa_result, l.hzn_serasa_dt,
+        l.hzn_serpro_result, l.hzn_serpro_dt,
+        l.hzn_vtal_client_result, l.hzn_vtal_client_dt,
+        l.hzn_vtal_qty_hc_result, l.hzn_vtal_qty_hc_dt,
+        l.hzn_street_view_result, l.hzn_street_view_dt,
+        l.vtal_address -> 'address' ->> 'zipCode' AS vtal_zip_code,
+        l.vtal_address -> 'address' ->> 'number' AS vtal_number,
+        CASE
+            WHEN sar.raw_json -> 'registration' IS NOT NULL
+            THEN json_build_object('registration', sar.raw_json -> 'registration')
+        END AS serasa_json,
+        GREATEST(l.updated_at, sar.updated_at, ear.updated_at, csar.updated_at) AS row_updated_at
+"""
+
+_LEAD_LIST_SELECT = "SELECT" + _LEAD_LIST_COLUMNS + _LEAD_JOINS
+
+# Inputs of services.audit_rules only: the JSON columns are cut down to the paths the
+# rules read, plus what an AddSales submission needs (addsales_code, cpf).
+_AUDIT_RULES_SELECT = """
+    SELECT
+        l.lead_id,
+        l.lead_dt,
+        l.name,
+        l.cpf,
+        l.cnpj,
+        l.addsales_code,
+        l.hzn_address_info_result,
+        l.hzn_biometrics_result,
+        l.hzn_consumer_doc_result,
+        l.hzn_corp_doc_result,
+        l.hzn_court_case_result,
+        l.hzn_informais_result,
+        l.hzn_serasa_result,
+        l.hzn_serpro_result,
+        l.hzn_vtal_client_result,
+        l.hzn_vtal_qty_hc_result,
+        l.hzn_street_view_result,
+        CASE
+            WHEN l.vtal_availability IS NOT NULL
+            THEN json_build_object(
+                'resource', json_build_object(
+                    'availabilityCode', l.vtal_availability -> 'resource' -> 'availabilityCode'
+                )
+            )
+        END AS vtal_availability,
+        sar.statusregistration,
+        sar.credit_score,
+        CASE
+            WHEN sar.raw_json IS NOT NULL
+            THEN json_build_object(
+                'negativeData', json_build_object(
+                    'pefin', json_build_object(
+                        'summary', json_build_object(
+                            'balance', sar.raw_json -> 'negativeData' -> 'pefin' -> 'summary' -> 'balance'
+                        )
+                    )
+                )
+            )
+        END AS serasa_json,
+        ear.active_cases_as_defendant,
+        ear.active_criminal_cases,
+        csar.doc_situation,
+        CASE
+            WHEN csar.raw_json IS NOT NULL
+            THEN json_build_object(
+                'data_inicio_atividade', csar.raw_json ->> 'data_inicio_atividade',
+                'descricao_situacao_cadastral', csar.raw_json ->> 'descricao_situacao_cadastral'
+            )
+        END AS cnpj_json
+""" + _LEAD_JOINS
+
+# Mirrors services.lead_status_service.define_lead_status.
+_LEAD_STATUS_SQL = """
+    CASE
+        WHEN l.hzn_audit AND l.hzn_final_result IS NULL THEN 'Necessária auditoria'
+        WHEN l.hzn_audit THEN INITCAP(l.hzn_final_result) || ' - Auditoria'
+        WHEN l.homeativo_status = 'Venda aprovada' THEN 'Aprovado'
+        WHEN l.homeativo_status = 'Reprovado' THEN 'Reprovado - AddSales'
+        ELSE 'Em Negociação - AddSales'
+    END
+"""
+
 
 def fetch_leads(engine: Engine, d_start: date, d_end: date) -> pd.DataFrame:
     """
     Fetch leads in a date range.
     """
     query = text(
+        _LEADS_SELECT
+        + """
+        WHERE lead_dt BETWEEN :d_start AND :d_end;
         """
-        SELECT
-            l.*,
-            sar.statusregistration,
-            sar.credit_score,
-            sar.all_addresses,
-            sar.all_phones,
-            sar.stolen_documents,
-            sar.renda_estimada,
-            sar.raw_json AS serasa_json,
-            ear.active_cases_as_defendant,
-            ear.active_criminal_cases,
-            csar.doc_situation,
-            csar.activity_start_date,
-            csar.raw_json AS cnpj_json
-        FROM "lead" l
-            LEFT JOIN serasa_api_results sar ON l.cpf = sar.documentnumber
-            LEFT JOIN escavador_api_results ear ON l.cpf = ear.cpf_cnpj
-            LEFT JOIN company_situation_api_results csar ON l.cnpj = csar.document
+    )
+
+    with engine.begin() as conn:
+        return pd.read_sql(query, conn, params={"d_start": d_start, "d_end": d_end})
+
+
+def fetch_lead_list(engine: Engine, d_start: date, d_end: date) -> pd.DataFrame:
+    """
+    Fetch the slim lead rows used by the list, filters and metrics.
+    serasa_json only carries the "registration" block (name fallbacks);
+    the heavy JSON columns are loaded per lead by fetch_lead_detail.
+    """
+    query = text(
+        _LEAD_LIST_SELECT
+        + """
         WHERE lead_dt BETWEEN :d_start AND :d_end;
         """
     )
@@ -40,26 +171,356 @@ def fetch_leads(engine: Engine, d_start: date, d_end: date) -> pd.DataFrame:
         return pd.read_sql(query, conn, params={"d_start": d_start, "d_end": d_end})
 
 
+def fetch_db_now(engine: Engine) -> datetime:
+    """
+    Database clock, used as the watermark of a leads load (taken before the load).
+    """
+    with engine.begin() as conn:
+        return conn.execute(text("SELECT NOW();")).scalar_one()
+
+
+def fetch_lead_list_changed_since(
+    engine: Engine,
+    since: datetime,
+    overlap: timedelta = timedelta(seconds=30),
+) -> pd.DataFrame:
+    """
+    Fetch slim lead rows whose lead or API-result rows changed since `since`, whatever
+    their lead_dt: leads moved out of the range must reach the merge to be dropped.
+    The changed lead_ids are collected per table on the updated_at indexes
+    (migration 001) and only those leads are joined.
+    `overlap` re-reads a short window before the mark so rows committed late
+    (NOW() is the transaction start) are not missed; callers merge by lead_id.
+    """
+    query = text(
+        """
+        WITH changed AS (
+            SELECT lead_id FROM "lead" WHERE updated_at >= :since
+            UNION
+            SELECT l.lead_id
+            FROM serasa_api_results sar
+                JOIN "lead" l ON l.cpf = sar.documentnumber
+            WHERE sar.updated_at >= :since
+            UNION
+            SELECT l.lead_id
+            FROM escavador_api_results ear
+                JOIN "lead" l ON l.cpf = ear.cpf_cnpj
+            WHERE ear.updated_at >= :since
+            UNION
+            SELECT l.lead_id
+            FROM company_situation_api_results csar
+                JOIN "lead" l ON l.cnpj = csar.document
+            WHERE csar.updated_at >= :since
+        )
+        """
+        + _LEAD_LIST_SELECT
+        + """
+        WHERE l.lead_id IN (SELECT lead_id FROM changed);
+        """
+    )
+
+    with engine.begin() as conn:
+        return pd.read_sql(query, conn, params={"since": since - overlap})
+
+
+def fetch_lead_detail(engine: Engine, lead_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Fetch the full row of one lead, including the heavy JSON columns.
+    """
+    query = text(
+        _LEADS_SELECT
+        + """
+        WHERE l.lead_id = :lead_id;
+        """
+    )
+
+    with engine.begin() as conn:
+        df = pd.read_sql(query, conn, params={"lead_id": lead_id})
+
+    return df.iloc[0].to_dict() if len(df) > 0 else None
+
+
+def fetch_lead_list_by_ids(engine: Engine, lead_ids: List[str]) -> pd.DataFrame:
+    """
+    Fetch the slim lead rows of the given leads.
+    """
+    query = text(
+        _LEAD_LIST_SELECT
+        + """
+        WHERE l.lead_id = ANY(:lead_ids);
+        """
+    )
+
+    with engine.begin() as conn:
+        return pd.read_sql(query, conn, params={"lead_ids": list(lead_ids)})
+
+
+def fetch_auditable_leads(engine: Engine, d_start: date, d_end: date) -> pd.DataFrame:
+    """
+    Fetch the leads waiting for the final audit ("Necessária auditoria") in a date
+    range, with only the columns the audit rules read (see _AUDIT_RULES_SELECT).
+    """
+    query = text(
+        _AUDIT_RULES_SELECT
+        + """
+        WHERE l.lead_dt BETWEEN :d_start AND :d_end
+          AND l.hzn_audit
+          AND l.hzn_final_result IS NULL;
+        """
+    )
+
+    with engine.begin() as conn:
+        return pd.read_sql(query, conn, params={"d_start": d_start, "d_end": d_end})
+
+
+def fetch_lead_metrics(
+    engine: Engine,
+    d_start: date,
+    d_end: date,
+    week_start: datetime,
+) -> Dict[str, int]:
+    """
+    Counts shown in the KPI strip, computed in one grouped query.
+    Status buckets use the same CASE as the list (define_lead_status).
+    """
+    query = text(
+        f"""
+        WITH leads AS (
+            SELECT
+                l.lead_dt,
+                l.hzn_audit,
+                l.hzn_final_result,
+                {_LEAD_STATUS_SQL} AS status
+            FROM "lead" l
+            WHERE l.lead_dt BETWEEN :d_start AND :d_end
+        )
+        SELECT
+            COUNT(*) AS total,
+            COUNT(*) FILTER (WHERE lead_dt >= :week_start) AS last_week,
+            COUNT(*) FILTER (WHERE status LIKE '%Aprovado%') AS approved,
+            COUNT(*) FILTER (WHERE status LIKE '%Reprovado%') AS rejected,
+            COUNT(*) FILTER (WHERE status = 'Aberto') AS open,
+            COUNT(*) FILTER (WHERE hzn_audit AND hzn_final_result IS NULL) AS auditable
+        FROM leads;
+        """
+    )
+
+    with engine.begin() as conn:
+        row = conn.execute(
+            query,
+            {"d_start": d_start, "d_end": d_end, "week_start": week_start},
+        ).mappings().one()
+
+    return {key: int(value) for key, value in row.items()}
+
+
+def _like_contains(value: str) -> str:
+    escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+# Server-side twin of search_name (fmt_leads_features fallbacks + fold_text), so the Nome
+# filter matches the same leads as the in-memory one. Needs the unaccent extension
+# (migration 005). unaccent transliterates a few characters NFKD drops (e.g. "ß" -> "ss").
+_SEARCH_NAME_SQL = r"""
+    lower(unaccent(
+        CASE
+            WHEN l.name IS NOT NULL THEN l.name
+            WHEN l.cpf IS NULL THEN 'Documento não fornecido'
+            WHEN sar.raw_json -> 'registration' IS NOT NULL
+                THEN sar.raw_json -> 'registration' ->> 'consumerName'
+            ELSE 'CPF: ' || regexp_replace(
+                translate(CAST(l.cpf AS text), '.-', ''),
+                '^(.{3})(.{3})(.{3})(.{2})$',
+                '\1.\2.\3-\4'
+            )
+        END
+    ))
+"""
+
+
+def fetch_lead_page(
+    engine: Engine,
+    d_start: date,
+    d_end: date,
+    *,
+    status: Optional[str] = None,
+    name: Optional[str] = None,
+    cpf: Optional[str] = None,
+    cep: Optional[str] = None,
+    cursor: Optional[Tuple[Any, str]] = None,
+    offset: int = 0,
+    page_size: int = 10,
+) -> Tuple[pd.DataFrame, int]:
+    """
+    Fetch one page of slim lead rows (newest first) plus the total count for the filters.
+    `cursor` is the (lead_dt, lead_id) of the previous page's last row (keyset paging);
+    `offset` is only used when no cursor is known, e.g. when jumping to a page.
+    cpf/cep must be digits only; name must be folded with fold_text (lowercase, no accents).
+    """
+    conditions = ["TRUE"]
+    params: Dict[str, Any] = {"d_start": d_start, "d_end": d_end}
+
+    if status:
+        conditions.append("status = :status")
+        params["status"] = status
+    if name:
+        conditions.append("search_name LIKE :name")
+        params["name"] = _like_contains(name)
+    if cpf:
+        conditions.append("cpf_digits LIKE :cpf")
+        params["cpf"] = _like_contains(cpf)
+    if cep:
+        conditions.append("cep_digits LIKE :cep")
+        params["cep"] = _like_contains(cep)
+
+    where = " AND ".join(conditions)
+    base = f"""
+        WITH leads AS (
+            SELECT
+                {_LEAD_LIST_COLUMNS},
+                {_LEAD_STATUS_SQL} AS status,
+                {_SEARCH_NAME_SQL} AS search_name,
+                regexp_replace(CAST(l.cpf AS text), '\\D', '', 'g') AS cpf_digits,
+                regexp_replace(l.vtal_address -> 'address' ->> 'zipCode', '\\D', '', 'g') AS cep_digits
+            {_LEAD_JOINS}
+            WHERE l.lead_dt BETWEEN :d_start AND :d_end
+        )
+    """
+
+    page_where = where
+    if cursor is not None:
+        page_where += " AND (lead_dt, lead_id) < (:cursor_dt, :cursor_id)"
+        params["cursor_dt"], params["cursor_id"] = cursor
+        offset = 0
+
+    count_query = text(base + f"SELECT COUNT(*) FROM leads WHERE {where};")
+    page_query = text(
+        base
+        + f"""
+        SELECT * FROM leads
+        WHERE {page_where}
+        ORDER BY lead_dt DESC, lead_id DESC
+        LIMIT :page_size OFFSET :offset;
+        """
+    )
+
+    with engine.begin() as conn:
+        total = int(conn.execute(count_query, params).scalar_one())
+        page_df = pd.read_sql(
+            page_query,
+            conn,
+            params={**params, "page_size": page_size, "offset": offset},
+        )
+
+    page_df = page_df.drop(columns=["search_name", "cpf_digits", "cep_digits"])
+    return page_df, total
+
+
 def update_audit_step(
     engine: Engine,
     lead_id: str,
     field_suffix: str,
     decision: str,
-) -> None:
+) -> Optional[Dict[str, Any]]:
     """
     Update one audit step (hzn_{suffix}_result + hzn_{suffix}_dt).
     field_suffix MUST be validated by caller (allowlist).
+    Returns the persisted column values, or None if the lead does not exist.
     """
     q = text(
         f"""
         UPDATE lead
         SET hzn_{field_suffix}_result = :decision,
             hzn_{field_suffix}_dt = NOW()
-        WHERE lead_id = :lead_id;
+        WHERE lead_id = :lead_id
+        RETURNING hzn_{field_suffix}_result, hzn_{field_suffix}_dt;
+        """
+    )
+    with engine.begin() as conn:
+        row = conn.execute(q, {"decision": decision, "lead_id": lead_id}).mappings().first()
+
+    return dict(row) if row is not None else None
+
+
+def update_audit_steps(
+    engine: Engine,
+    decisions: Dict[str, Dict[str, str]],
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Update several audit steps ({lead_id: {suffix: decision}}) in one transaction,
+    one UPDATE per lead. Suffixes MUST be validated by caller (allowlist).
+    Returns the persisted column values by lead_id (missing leads are left out).
+    """
+    updated: Dict[str, Dict[str, Any]] = {}
+
+    with engine.begin() as conn:
+        for lead_id, steps in decisions.items():
+            assignments = ", ".join(
+                f"hzn_{suffix}_result = :{suffix}, hzn_{suffix}_dt = NOW()" for suffix in steps
+            )
+            returning = ", ".join(f"hzn_{suffix}_result, hzn_{suffix}_dt" for suffix in steps)
+            q = text(
+                f"""
+                UPDATE lead
+                SET {assignments}
+                WHERE lead_id = :lead_id
+                RETURNING {returning};
+                """
+            )
+            row = conn.execute(q, {**steps, "lead_id": lead_id}).mappings().first()
+            if row is not None:
+                updated[lead_id] = dict(row)
+
+    return updated
+
+
+def update_audit_step_bulk(
+    engine: Engine,
+    *,
+    field_suffix: str,
+    decisions: Dict[str, str],
+    batch_size: int = 1000,
+) -> int:
+    """
+    Set one audit step for many leads ({lead_id: decision}) with batched executemany UPDATEs,
+    in one transaction. Leads already holding the same decision are not touched.
+    field_suffix MUST be validated by caller (allowlist).
+    Returns the number of updated rows.
+    """
+    col_result = f"hzn_{field_suffix}_result"
+    col_dt = f"hzn_{field_suffix}_dt"
+
+    q = text(
+        f"""
+        UPDATE lead
+        SET {col_result} = :decision,
+            {col_dt} = NOW()
+        WHERE lead_id = :lead_id
+          AND {col_result} IS DISTINCT FROM :decision;
         """
     )
+
+    params = [{"lead_id": lead_id, "decision": decision} for lead_id, decision in decisions.items()]
+    updated = 0
+
     with engine.begin() as conn:
-        conn.execute(q, {"decision": decision, "lead_id": lead_id})
+        for start in range(0, len(params), batch_size):
+            result = conn.execute(q, params[start:start + batch_size])
+            updated += max(result.rowcount, 0)
+
+    return updated
+
+
+_UPDATE_AUDIT_RESULT_SQL = """
+    UPDATE lead
+    SET hzn_final_result = :decision,
+        hzn_final_result_dt = NOW(),
+        hzn_pending = :pending_obs,
+        hzn_denied = :denied_obs
+    WHERE lead_id = :lead_id
+    RETURNING hzn_final_result, hzn_final_result_dt, hzn_pending, hzn_denied;
+"""
 
 
 def update_audit_result(
@@ -68,27 +529,122 @@ def update_audit_result(
     decision: str,
     pending_obs: Optional[str] = None,
     denied_obs: Optional[str] = None,
-) -> None:
+) -> Optional[Dict[str, Any]]:
     """
     Update final audit result and notes.
+    Returns the persisted column values, or None if the lead does not exist.
     """
+    q = text(_UPDATE_AUDIT_RESULT_SQL)
+    with engine.begin() as conn:
+        row = conn.execute(
+            q,
+            {
+                "decision": decision,
+                "pending_obs": pending_obs,
+                "denied_obs": denied_obs,
+                "lead_id": lead_id,
+            },
+        ).mappings().first()
+
+    return dict(row) if row is not None else None
+
+
+def update_audit_result_with_outbox(
+    engine: Engine,
+    *,
+    lead_id: str,
+    decision: str,
+    pending_obs: Optional[str],
+    denied_obs: Optional[str],
+    addsales_code: str,
+    payload: Dict[str, Any],
+    idempotency_key: str,
+) -> Optional[Dict[str, Any]]:
+    """
+    Update final audit result and notes and queue the AddSales submission
+    (outbox_repo.insert_messages) in the same transaction.
+    Returns the persisted column values, or None if the lead does not exist (nothing is queued).
+    """
+    q = text(_UPDATE_AUDIT_RESULT_SQL)
+    with engine.begin() as conn:
+        row = conn.execute(
+            q,
+            {
+                "decision": decision,
+                "pending_obs": pending_obs,
+                "denied_obs": denied_obs,
+                "lead_id": lead_id,
+            },
+        ).mappings().first()
+        if row is None:
+            return None
+
+        outbox_repo.insert_messages(
+            conn,
+            [
+                {
+                    "lead_id": lead_id,
+                    "addsales_code": addsales_code,
+                    "payload": payload,
+                    "idempotency_key": idempotency_key,
+                }
+            ],
+        )
+
+    return dict(row)
+
+
+def update_audit_results_with_outbox(
+    engine: Engine,
+    submissions: List[Dict[str, Any]],
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Bulk update_audit_result_with_outbox: one UPDATE for every submission
+    ({lead_id, decision, pending_obs, denied_obs, addsales_code, payload, idempotency_key})
+    and their outbox rows, in one transaction. Only leads still awaiting audit
+    (hzn_audit and no final result) are updated: the list may be stale and a decision
+    taken meanwhile by another auditor must not be overwritten.
+    Returns the persisted column values by lead_id (skipped and missing leads are left
+    out and not queued).
+    """
+    if not submissions:
+        return {}
+
     q = text(
         """
-        UPDATE lead
-        SET hzn_final_result = :decision,
+        UPDATE lead l
+        SET hzn_final_result = d.decision,
             hzn_final_result_dt = NOW(),
-            hzn_pending = :pending_obs,
-            hzn_denied = :denied_obs
-        WHERE lead_id = :lead_id;
+            hzn_pending = d.pending_obs,
+            hzn_denied = d.denied_obs
+        FROM unnest(
+            :lead_ids,
+            CAST(:decisions AS text[]),
+            CAST(:pending_obs AS text[]),
+            CAST(:denied_obs AS text[])
+        ) AS d(lead_id, decision, pending_obs, denied_obs)
+        WHERE l.lead_id = d.lead_id
+          AND l.hzn_audit
+          AND l.hzn_final_result IS NULL
+        RETURNING l.lead_id, l.hzn_final_result, l.hzn_final_result_dt, l.hzn_pending, l.hzn_denied;
         """
     )
+
     with engine.begin() as conn:
-        conn.execute(
+        rows = conn.execute(
             q,
             {
-                "decision": decision,
-                "pending_obs": pending_obs,
-                "denied_obs": denied_obs,
-                "lead_id": lead_id,
+                "lead_ids": [item["lead_id"] for item in submissions],
+                "decisions": [item["decision"] for item in submissions],
+                "pending_obs": [item.get("pending_obs") for item in submissions],
+                "denied_obs": [item.get("denied_obs") for item in submissions],
             },
-        )
\ No newline at end of file
+        ).mappings().all()
+
+        updated = {str(row["lead_id"]): {k: v for k, v in row.items() if k != "lead_id"} for row in rows}
+        outbox_repo.insert_messages(
+            conn,
+            [item for item in submissions if str(item["lead_id"]) in updated],
+        )
+
+    return updated
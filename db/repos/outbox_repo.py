@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+
+def _json_default(value: Any) -> Any:
+    # numpy scalars (rows read through pandas) and dates/decimals.
+    return value.item() if hasattr(value, "item") else str(value)
+
+
+def insert_messages(conn: Connection, messages: List[Dict[str, Any]]) -> None:
+    """
+    Queue AddSales submissions ({lead_id, addsales_code, payload, idempotency_key})
+    inside the caller's transaction; undelivered older submissions of the same leads
+    are superseded (only the latest decision is sent). A submission being delivered
+    right now is left to its sender: mark_failed supersedes it if it fails.
+    """
+    if not messages:
+        return
+
+    conn.execute(
+        text(
+            """
+            UPDATE addsales_outbox
+            SET status = 'superseded',
+                locked_until = NULL
+            WHERE lead_id = ANY(CAST(:lead_ids AS text[]))
+              AND (status = 'pending' OR (status = 'sending' AND locked_until < NOW()));
+            """
+        ),
+        {"lead_ids": [str(message["lead_id"]) for message in messages]},
+    )
+
+    conn.execute(
+        text(
+            """
+            INSERT INTO addsales_outbox (idempotency_key, lead_id, addsales_code, payload)
+            VALUES (:idempotency_key, :lead_id, :addsales_code, CAST(:payload AS jsonb));
+            """
+        ),
+        [
+            {
+                "idempotency_key": message["idempotency_key"],
+                "lead_id": str(message["lead_id"]),
+                "addsales_code": message["addsales_code"],
+                "payload": json.dumps(message["payload"], default=_json_default),
+            }
+            for message in messages
+        ],
+    )
+
+
+def claim_messages(engine: Engine, *, limit: int, lease_s: int) -> List[Dict[str, Any]]:
+    """
+    Claim up to `limit` due messages for delivery (SKIP LOCKED: concurrent senders never
+    claim the same row). A claim expires after `lease_s` seconds, so messages of a
+    sender that died mid-delivery are picked up again.
+
+    Per lead, only the newest non-superseded submission is claimed, and not while an
+    older one is still being delivered: decisions reach AddSales one at a time, in order.
+    """
+    q = text(
+        """
+        UPDATE addsales_outbox o
+        SET status = 'sending',
+            attempts = o.attempts + 1,
+            locked_until = NOW() + make_interval(secs => :lease_s)
+        WHERE o.outbox_id IN (
+            SELECT c.outbox_id
+            FROM addsales_outbox c
+            WHERE (
+                    (c.status = 'pending' AND c.next_attempt_at <= NOW())
+                    OR (c.status = 'sending' AND c.locked_until < NOW())
+                )
+              AND NOT EXISTS (
+                  SELECT 1
+                  FROM addsales_outbox other
+                  WHERE other.lead_id = c.lead_id
+                    AND (
+                        (other.outbox_id > c.outbox_id AND other.status <> 'superseded')
+                        OR (
+                            other.outbox_id < c.outbox_id
+                            AND other.status = 'sending'
+                            AND other.locked_until >= NOW()
+                        )
+                    )
+              )
+            ORDER BY c.next_attempt_at
+            LIMIT :limit
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING o.outbox_id, o.idempotency_key, o.lead_id, o.addsales_code, o.payload, o.attempts;
+        """
+    )
+    with engine.begin() as conn:
+        rows = conn.execute(q, {"limit": limit, "lease_s": lease_s}).mappings().all()
+
+    return [dict(row) for row in rows]
+
+
+def mark_sent(engine: Engine, *, outbox_id: int, response_status: int) -> None:
+    q = text(
+        """
+        UPDATE addsales_outbox
+        SET status = 'sent',
+            sent_at = NOW(),
+            locked_until = NULL,
+            last_error = NULL,
+            response_status = :response_status
+        WHERE outbox_id = :outbox_id;
+        """
+    )
+    with engine.begin() as conn:
+        conn.execute(q, {"outbox_id": outbox_id, "response_status": response_status})
+
+
+def mark_failed(
+    engine: Engine,
+    *,
+    outbox_id: int,
+    error: str,
+    retry_in_s: Optional[float],
+    refund_attempt: bool = False,
+) -> None:
+    """
+    Record a failed delivery: back to 'pending' after `retry_in_s` seconds,
+    or 'failed' for good when `retry_in_s` is None. A submission that a newer
+    decision of the same lead replaced meanwhile becomes 'superseded' instead.
+    `refund_attempt` gives back the attempt counted by claim_messages (nothing was sent).
+    """
+    q = text(
+        """
+        UPDATE addsales_outbox o
+        SET status = CASE
+                WHEN EXISTS (
+                    SELECT 1
+                    FROM addsales_outbox newer
+                    WHERE newer.lead_id = o.lead_id
+                      AND newer.outbox_id > o.outbox_id
+                      AND newer.status <> 'superseded'
+                ) THEN 'superseded'
+                WHEN CAST(:retry_in_s AS double precision) IS NULL THEN 'failed'
+                ELSE 'pending'
+            END,
+            attempts = o.attempts - CASE WHEN CAST(:refund_attempt AS boolean) THEN 1 ELSE 0 END,
+            next_attempt_at = NOW() + make_interval(secs => COALESCE(CAST(:retry_in_s AS double precision), 0)),
+            locked_until = NULL,
+            last_error = :error
+        WHERE outbox_id = :outbox_id;
+        """
+    )
+    with engine.begin() as conn:
+        conn.execute(
+            q,
+            {"outbox_id": outbox_id, "error": error, "retry_in_s": retry_in_s, "refund_attempt": refund_attempt},
+        )
+
+
+def requeue_lead(engine: Engine, lead_id: str) -> bool:
+    """
+    Send the latest failed submission of a lead again. Returns False when there is none.
+    """
+    q = text(
+        """
+        UPDATE addsales_outbox
+        SET status = 'pending',
+            attempts = 0,
+            next_attempt_at = NOW()
+        WHERE outbox_id = (
+            SELECT outbox_id
+            FROM addsales_outbox
+            WHERE lead_id = CAST(:lead_id AS text)
+            ORDER BY created_at DESC
+            LIMIT 1
+        )
+          AND status = 'failed'
+        RETURNING outbox_id;
+        """
+    )
+    with engine.begin() as conn:
+        return conn.execute(q, {"lead_id": str(lead_id)}).first() is not None
+
+
+def fetch_delivery_states(engine: Engine, lead_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Delivery state of the latest submission of each lead (leads never submitted are left out).
+    """
+    if not lead_ids:
+        return {}
+
+    q = text(
+        """
+        SELECT DISTINCT ON (lead_id)
+            lead_id, outbox_id, status, attempts, last_error, created_at, sent_at, next_attempt_at
+        FROM addsales_outbox
+        WHERE lead_id = ANY(CAST(:lead_ids AS text[]))
+        ORDER BY lead_id, created_at DESC;
+        """
+    )
+    with engine.begin() as conn:
+        rows = conn.execute(q, {"lead_ids": [str(lead_id) for lead_id in lead_ids]}).mappings().all()
+
+    return {row["lead_id"]: dict(row) for row in rows}
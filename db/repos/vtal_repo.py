@@ -1,20 +1,14 @@
 from __future__ import annotations
 
 from datetime import date
-from typing import Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import pandas as pd
 from sqlalchemy import text
 from sqlalchemy.engine import Engine
 
 
-def fetch_vtal_history(engine: Engine, address: dict) -> pd.DataFrame:
-    """
-    Fetch vtal HCs history.
-    """
-    query = text(
-        """
-        SELECT
+_VTAL_HISTORY_COLUMNS = """
             vhc.zip AS "CEP",
             vhc.number AS "Número",
             CONCAT_WS(', ', vhc.address_detail_1, vhc.address_detail_2, vhc.address_detail_3)  AS "Complemento",
@@ -27,6 +21,17 @@ def fetch_vtal_history(engine: Engine, address: dict) -> pd.DataFrame:
             vcl.churn_type AS "Tipo Churn",
             vcl.status AS "Status - V.Tal",
             vcl.last_block_dt as "Último bloqueio"
+"""
+
+
+def fetch_vtal_history(engine: Engine, address: dict) -> pd.DataFrame:
+    """
+    Fetch vtal HCs history.
+    """
+    query = text(
+        f"""
+        SELECT
+            {_VTAL_HISTORY_COLUMNS}
         FROM vtal_homeconnection_v2 vhc
             JOIN vtal_customer_life_v2 vcl on vhc.hc = vcl.hc 
         WHERE vhc.zip = :zip_code AND vhc.number = :number
@@ -42,4 +47,69 @@ def fetch_vtal_history(engine: Engine, address: dict) -> pd.DataFrame:
         )
 
     hc_history_df = hc_history_df.replace(' ', None)
-    return hc_history_df
\ No newline at end of file
+    return hc_history_df
+
+
+# Summary of an address without any HC (no row in the view).
+EMPTY_VTAL_CHURN_SUMMARY = {
+    "hc_count": 0,
+    "active_hc_count": 0,
+    "vol_churn_count": 0,
+    "invol_churn_count": 0,
+    "active_client": False,
+    "vol_churn_3m": False,
+    "invol_churn_6m": False,
+    "refreshed_at": None,
+}
+
+
+def fetch_vtal_churn_summaries(
+    engine: Engine,
+    addresses: List[Tuple[str, str]],
+) -> Dict[Tuple[str, str], Dict[str, Any]]:
+    """
+    Precomputed V.Tal verdicts of many (zipCode, number) pairs in one indexed lookup
+    (materialized view vtal_address_churn_summary, see db/migrations/003).
+    Returns one summary per requested pair (EMPTY_VTAL_CHURN_SUMMARY when the address has no HCs).
+    """
+    addresses = list(dict.fromkeys((str(zip_code), str(number)) for zip_code, number in addresses))
+    if not addresses:
+        return {}
+
+    query = text(
+        """
+        SELECT
+            s.zip,
+            s.number,
+            s.hc_count,
+            s.active_hc_count,
+            s.vol_churn_count,
+            s.invol_churn_count,
+            s.active_hc_count > 0 AS active_client,
+            COALESCE(s.last_vol_churn_3m_pickup_dt >= CURRENT_DATE - INTERVAL '24 months', FALSE) AS vol_churn_3m,
+            COALESCE(s.last_invol_churn_6m_pickup_dt >= CURRENT_DATE - INTERVAL '24 months', FALSE) AS invol_churn_6m,
+            s.refreshed_at
+        FROM unnest(CAST(:zips AS text[]), CAST(:numbers AS text[])) AS a(zip, number)
+            JOIN vtal_address_churn_summary s ON s.zip = a.zip AND s.number = a.number;
+        """
+    )
+
+    with engine.begin() as conn:
+        rows = conn.execute(
+            query,
+            {
+                "zips": [zip_code for zip_code, _ in addresses],
+                "numbers": [number for _, number in addresses],
+            },
+        ).mappings().all()
+
+    summaries = {(row["zip"], row["number"]): dict(row) for row in rows}
+    return {key: summaries.get(key, dict(EMPTY_VTAL_CHURN_SUMMARY)) for key in addresses}
+
+
+def refresh_vtal_churn_summary(engine: Engine) -> None:
+    """
+    Rebuild vtal_address_churn_summary without blocking readers.
+    """
+    with engine.begin() as conn:
+        conn.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY vtal_address_churn_summary;"))
@@ -2,24 +2,38 @@ import locale
 import os
 from datetime import date, datetime, timedelta
 from functools import partial
+from typing import Tuple
 
 import pandas as pd
 import streamlit as st
 from dotenv import load_dotenv
 
-from auth import auth_gate
+from auth import auth_gate, user_roles
 from clients import addsales_client
-from core.state import bump_leads_version, get_leads_query, init_session_state
+from core.state import (
+    bump_leads_version,
+    get_leads_query,
+    init_session_state,
+    patch_leads_snapshot,
+    reset_leads_snapshot,
+)
+from core.timing import span, timed, timed_rerun
 from db.engine import get_engine
-from db.repos import lead_repo
+from db.repos import lead_repo, outbox_repo
 from services import audit_services
-from services.lead_status_service import define_lead_status
+from services.addsales_outbox import OutboxSender
+from services.lead_snapshot_service import add_search_keys, merge_leads_delta
+from services.lead_status_service import define_lead_status_frame
 from ui.components.leads_view import build_detailed_lead_display, build_lead_overall_display
+from ui.components.timing_panel import build_timing_panel
 from ui.formatters import fmt_date, fmt_leads_features
 from ui.sections.analysis import (
     build_detailed_analysis_info_for_lead,
     build_first_analysis_info_for_lead,
+    prefetch_vtal_summaries,
 )
+from ui.sections.audit_helpers import flush_audit_step_decisions
+from ui.sections.bulk_audit import build_bulk_audit_section
 from ui.sections.general import build_general_info_for_lead
 from ui.styles import inject_badges_css
 
@@ -32,66 +46,159 @@ inject_badges_css()
 init_session_state()
 
 ITEMS_PER_PAGE = 10
+# Above this many leads in the range, the list is filtered and paged by the database.
+LEADS_SERVER_SIDE_THRESHOLD = 20_000
 
 
-@st.cache_data(show_spinner="Carregando leads...")
-def load_leads_snapshot(d_start: date, d_end: date, version: int) -> pd.DataFrame:
-    db_engine = get_engine("local")
-    df = lead_repo.fetch_leads(db_engine, d_start=d_start, d_end=d_end)
+def _prepare_leads_frame(df: pd.DataFrame) -> pd.DataFrame:
     df = fmt_leads_features(df)
 
     if len(df) > 0:
-        df["status"] = df.apply(define_lead_status, axis=1)
+        df["status"] = define_lead_status_frame(df)
+        df = add_search_keys(df)
         df = df.sort_values("lead_dt", ascending=False)
 
     return df
 
 
-def get_leads_dataframe(start: date, end: date) -> pd.DataFrame:
-    leads_query = get_leads_query(start, end)
+@st.cache_data(show_spinner="Carregando leads...")
+def load_leads_snapshot(d_start: date, d_end: date, version: int) -> Tuple[pd.DataFrame, datetime]:
+    """
+    Leads of the range plus the database time read before loading them: the watermark
+    of the next delta (max(row_updated_at) of an old range would be far in the past).
+    """
+    db_engine = get_engine("local")
+    as_of = lead_repo.fetch_db_now(db_engine)
+    df = lead_repo.fetch_lead_list(db_engine, d_start=d_start, d_end=d_end)
+    return _prepare_leads_frame(df), as_of
+
+
+def load_leads_delta(since: datetime) -> Tuple[pd.DataFrame, datetime]:
+    db_engine = get_engine("local")
+    as_of = lead_repo.fetch_db_now(db_engine)
+    df = lead_repo.fetch_lead_list_changed_since(db_engine, since=since)
+    return _prepare_leads_frame(df), as_of
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def load_lead_row(lead_id: str, *, version: int, patch_version: int) -> dict | None:
+    db_engine = get_engine("local")
+    df = _prepare_leads_frame(lead_repo.fetch_lead_list_by_ids(db_engine, [lead_id]))
+    return df.iloc[0].to_dict() if len(df) > 0 else None
 
-    if st.session_state.get("_leads_query") != leads_query or st.session_state.get("df_leads") is None:
-        st.session_state["_leads_query"] = leads_query
-        st.session_state["df_leads"] = load_leads_snapshot(
-            leads_query.start, leads_query.end, leads_query.version
-        )
 
+@st.cache_data(show_spinner="Carregando lead...", max_entries=64)
+def load_lead_detail(lead_id: str, updated_at) -> dict:
+    db_engine = get_engine("local")
+    return lead_repo.fetch_lead_detail(db_engine, lead_id) or {}
+
+
+def get_lead_detail(lead_row: dict) -> dict:
+    """
+    Full lead record: heavy columns from the per-lead cache, overlaid with the
+    list row (formatted names, status and in-place patched audit columns).
+    The list's serasa_json only carries the registration block, so it is not overlaid.
+    """
+    lead = dict(load_lead_detail(lead_row["lead_id"], lead_row.get("row_updated_at")))
+    lead.update({k: v for k, v in lead_row.items() if k != "serasa_json"})
+    return lead
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def load_leads_page(
+    d_start: date,
+    d_end: date,
+    version: int,
+    patch_version: int,
+    *,
+    status=None,
+    name=None,
+    cpf=None,
+    cep=None,
+    cursor=None,
+    offset: int = 0,
+    page_size: int = ITEMS_PER_PAGE,
+):
+    db_engine = get_engine("local")
+    page_df, total = lead_repo.fetch_lead_page(
+        db_engine,
+        d_start,
+        d_end,
+        status=status,
+        name=name,
+        cpf=cpf,
+        cep=cep,
+        cursor=cursor,
+        offset=offset,
+        page_size=page_size,
+    )
+    return fmt_leads_features(page_df), total
+
+
+def get_leads_dataframe(start: date, end: date) -> pd.DataFrame:
+    leads_query = get_leads_query(start, end)
+    loaded_query = st.session_state.get("_leads_query")
     df_leads = st.session_state.get("df_leads")
-    return df_leads if df_leads is not None else pd.DataFrame()
+    watermark = st.session_state.get("leads_watermark")
 
+    same_range = (
+        loaded_query is not None
+        and (loaded_query.start, loaded_query.end) == (leads_query.start, leads_query.end)
+    )
 
-def build_overall_metrics(df: pd.DataFrame, end_date) -> None:
-    df_local = df.copy() if df is not None else pd.DataFrame()
+    if df_leads is None or not same_range or watermark is None:
+        if st.session_state.get("_leads_patched"):
+            bump_leads_version()
+            st.session_state["_leads_patched"] = False
+            leads_query = get_leads_query(start, end)
 
-    if "lead_dt" in df_local.columns:
-        df_local["lead_dt"] = pd.to_datetime(df_local["lead_dt"], errors="coerce")
+        with span("load_leads_snapshot"):
+            df_leads, as_of = load_leads_snapshot(
+                leads_query.start, leads_query.end, leads_query.version
+            )
+        st.session_state["leads_watermark"] = as_of
+    elif loaded_query.version != leads_query.version:
+        with span("load_leads_delta"):
+            df_delta, as_of = load_leads_delta(since=watermark)
+        df_leads = merge_leads_delta(df_leads, df_delta, leads_query.start, leads_query.end)
+        st.session_state["leads_watermark"] = as_of
+
+    st.session_state["_leads_query"] = leads_query
+    st.session_state["df_leads"] = df_leads
+    return df_leads if df_leads is not None else pd.DataFrame()
 
-    end_ts = pd.to_datetime(end_date)
-    week_start = end_ts - pd.Timedelta(days=7)
 
-    total_leads = int(df_local.shape[0])
-    status_col = (
-        df_local["status"].fillna("")
-        if "status" in df_local.columns
-        else pd.Series([], dtype=str)
+# Keyed on the leads version: old versions age out instead of piling up.
+@st.cache_data(show_spinner=False, ttl=600, max_entries=64)
+def load_leads_metrics(d_start: date, d_end: date, version: int, patch_version: int) -> dict:
+    db_engine = get_engine("local")
+    week_start = pd.to_datetime(d_end) - pd.Timedelta(days=7)
+    return lead_repo.fetch_lead_metrics(
+        db_engine,
+        d_start=d_start,
+        d_end=d_end,
+        week_start=week_start.to_pydatetime(),
     )
 
-    if "lead_dt" in df_local.columns:
-        novos_leads = int(df_local[df_local["lead_dt"] >= week_start].shape[0])
-    else:
-        novos_leads = 0
 
+def get_leads_metrics(start: date, end: date) -> dict:
+    leads_query = get_leads_query(start, end)
+    return load_leads_metrics(
+        leads_query.start,
+        leads_query.end,
+        leads_query.version,
+        st.session_state["leads_patch_version"],
+    )
 
-    leads_aprovados = int(status_col.str.contains("Aprovado").sum()) if len(status_col) else 0
-    leads_reprovados = int(status_col.str.contains("Reprovado").sum()) if len(status_col) else 0
-    leads_abertos = int((status_col == "Aberto").sum()) if len(status_col) else 0
 
-    if {"hzn_audit", "hzn_final_result"}.issubset(df_local.columns):
-        leads_auditaveis = int(
-            df_local[(df_local["hzn_audit"]) & (pd.isna(df_local["hzn_final_result"]))].shape[0]
-        )
-    else:
-        leads_auditaveis = 0
+@timed()
+def build_overall_metrics(metrics: dict) -> None:
+    total_leads = metrics["total"]
+    novos_leads = metrics["last_week"]
+    leads_aprovados = metrics["approved"]
+    leads_reprovados = metrics["rejected"]
+    leads_abertos = metrics["open"]
+    leads_auditaveis = metrics["auditable"]
 
     delta_novos_leads = 100 * (novos_leads / total_leads) if total_leads > 0 else 0
     delta_novos_leads = (
@@ -117,6 +224,7 @@ def build_overall_metrics(df: pd.DataFrame, end_date) -> None:
         st.metric("**Leads Auditáveis**", f"{leads_auditaveis:,}".replace(",", "."))
 
 
+@timed()
 def build_audit_structure(lead):
     st.subheader("Decisão da Auditoria")
 
@@ -147,36 +255,24 @@ def build_audit_structure(lead):
         st.rerun()
 
     def submit_audit_result(decision: str, *, pending_obs: str | None, denied_obs: str | None) -> bool:
-        addsales_token = os.getenv("ADDSALES_TOKEN")
-        if not addsales_token:
+        if not os.getenv("ADDSALES_TOKEN"):
             st.error("Token AddSales não encontrado.")
             return False
 
-        payload = {
-            "codigo_lead_addsales": lead["addsales_code"],
-            "cpf": lead["cpf"],
-            "data_auditoria": datetime.now().isoformat(),
-            "descricao_pendencias": pending_obs,
-            "motivos_reprovacao": denied_obs,
-            "resultado_auditoria": decision,
-        }
-
-        try:
-            addsales_client.update_lead(
-                token=addsales_token,
-                addsales_code=str(lead["addsales_code"]),
-                payload=payload,
-            )
-        except Exception as exc:
-            st.error(f"Erro AddSales: {exc}")
-            return False
-
-        update_audit_result_features(
-            lead["lead_id"],
-            decision,
+        # Decision + AddSales message in one transaction; the outbox sender delivers it.
+        result = audit_services.submit_final_audit_result(
+            db_engine,
+            lead=lead,
+            decision=decision,
             pending_obs=pending_obs,
             denied_obs=denied_obs,
         )
+        if not result.ok:
+            st.error(result.message)
+            return False
+
+        get_outbox_sender().wake()
+        patch_leads_snapshot(lead["lead_id"], result.values)
         return True
 
     if not decision_made or edit_mode:
@@ -184,6 +280,7 @@ def build_audit_structure(lead):
             if submit_audit_result("aprovado", pending_obs=None, denied_obs=None):
                 st.session_state.new_decision = False
                 st.session_state.audit_action = None
+                st.rerun()
 
         elif st.session_state.audit_action in ("pendente", "reprovado"):
             note = st.text_area(
@@ -207,6 +304,7 @@ def build_audit_structure(lead):
                     ):
                         st.session_state.new_decision = False
                         st.session_state.audit_action = None
+                        st.rerun()
     
     if decision_made:
         fmt_status = lead["status"].split(" - ")[0]
@@ -220,6 +318,7 @@ def build_audit_structure(lead):
             "Lead já auditado. Decisão feita: "
             f":{color}[**{fmt_status}**] - :{color}[**{fmt_date(lead['hzn_final_result_dt'])}**]"
         )
+        build_addsales_delivery_state(lead)
 
         if not edit_mode:
             if lead["hzn_final_result"] == "pendente":
@@ -236,85 +335,142 @@ def build_audit_structure(lead):
                 st.rerun()
 
 
-def update_audit_result_features(lead_id, decision, pending_obs=None, denied_obs=None):
-    result = audit_services.set_final_audit_result(
-        db_engine,
-        lead_id=lead_id,
-        decision=decision,
-        pending_obs=pending_obs,
-        denied_obs=denied_obs,
-    )
+@st.cache_resource
+def get_outbox_sender() -> OutboxSender:
+    """
+    One AddSales outbox sender thread per server process.
+    """
+    return OutboxSender(get_engine("local"), addsales_client.get_client()).start()
 
-    if not result.ok:
-        st.error(result.message)
+
+def build_addsales_delivery_state(lead) -> None:
+    state = outbox_repo.fetch_delivery_states(db_engine, [lead["lead_id"]]).get(str(lead["lead_id"]))
+    if state is None:
         return
 
-    bump_leads_version()
-    st.rerun()
+    if state["status"] == "sent":
+        st.caption(f"AddSales: :green[**enviado**] - {fmt_date(state['sent_at'])}")
+    elif state["status"] == "failed":
+        st.caption(
+            f"AddSales: :red[**falha no envio**] após {state['attempts']} tentativas - {state['last_error']}"
+        )
+        if st.button("Reenviar para AddSales", use_container_width=True):
+            outbox_repo.requeue_lead(db_engine, lead["lead_id"])
+            get_outbox_sender().wake()
+            st.rerun()
+    else:
+        retry_note = f" (tentativa {state['attempts']}: {state['last_error']})" if state["last_error"] else ""
+        st.caption(f"AddSales: :orange[**envio pendente**]{retry_note}")
 
 
 st.set_page_config(page_title="SalesLab", page_icon="🔬", layout="wide")
 authenticator = auth_gate()
 
 if st.session_state.get("authentication_status"):
-    st.title("Histórico de Leads - SalesLab")
+    with timed_rerun(user=st.session_state.get("username")):
+        st.title("Histórico de Leads - SalesLab")
 
-    with st.sidebar:
-        name = st.session_state.name
+        with st.sidebar:
+            name = st.session_state.name
 
-        st.markdown(f"**Olá, {name}** 👋")
-        authenticator.logout("Sair", "sidebar")
+            st.markdown(f"**Olá, {name}** 👋")
+            authenticator.logout("Sair", "sidebar")
 
 
-    c1, c2, c3 = st.columns([1.2, 1, 1])
-    with c1:
-        st.subheader("Resumo de Leads")
-    with c2:
-        start = st.date_input(
-            "Início",
-            date.today() - timedelta(days=7),
-            format="DD/MM/YYYY",
-        )
-    with c3:
-        end = st.date_input("Fim", date.today(), format="DD/MM/YYYY")
+        c1, c2, c3 = st.columns([1.2, 1, 1])
+        with c1:
+            st.subheader("Resumo de Leads")
+        with c2:
+            start = st.date_input(
+                "Início",
+                date.today() - timedelta(days=7),
+                format="DD/MM/YYYY",
+            )
+        with c3:
+            end = st.date_input("Fim", date.today(), format="DD/MM/YYYY")
 
-    db_engine = get_engine("local")
-    df_leads = get_leads_dataframe(start, end)
+        db_engine = get_engine("local")
+        get_outbox_sender()
+        metrics = get_leads_metrics(start, end)
 
-    if len(df_leads) == 0:
-        st.error("No intervalo escolhido não existe nenhum lead...")
-    else:
-        build_overall_metrics(df_leads, end)
-
-        if st.button(
-            "**Atualizar Leads**",
-            use_container_width=True,
-            icon="🔄",
-            type="tertiary",
-        ):
-            bump_leads_version()
-            st.cache_data.clear()
-            st.rerun()
+        if metrics["total"] == 0:
+            st.error("No intervalo escolhido não existe nenhum lead...")
+        else:
+            build_overall_metrics(metrics)
+
+            if st.button(
+                "**Atualizar Leads**",
+                use_container_width=True,
+                icon="🔄",
+                type="tertiary",
+            ):
+                reset_leads_snapshot()
+                st.cache_data.clear()
+                st.rerun()
 
-        st.divider()
-
-        left_pannel, right_pannel = st.columns([1, 1.8])
-        with left_pannel:
-            build_lead_overall_display(df_leads, items_per_page=ITEMS_PER_PAGE)
-        with right_pannel:
-            build_detailed_lead_display(
-                df_leads,
-                render_general=build_general_info_for_lead,
-                render_first_analysis=partial(
-                    build_first_analysis_info_for_lead,
-                    db_engine=db_engine,
-                ),
-                render_detailed_analysis=partial(
-                    build_detailed_analysis_info_for_lead,
-                    db_engine=db_engine,
-                ),
-                render_audit=build_audit_structure,
+            build_bulk_audit_section(
+                d_start=start,
+                d_end=end,
+                db_engine=db_engine,
+                wake_sender=get_outbox_sender().wake,
             )
 
+            st.divider()
+
+            # Large ranges are never loaded in memory: the database filters and pages the list.
+            server_side = metrics["total"] > LEADS_SERVER_SIDE_THRESHOLD
+            df_leads = None if server_side else get_leads_dataframe(start, end)
+            leads_query = get_leads_query(start, end)
+
+            left_pannel, right_pannel = st.columns([1, 1.8])
+            with left_pannel:
+                build_lead_overall_display(
+                    df_leads,
+                    items_per_page=ITEMS_PER_PAGE,
+                    fetch_page=(
+                        partial(
+                            load_leads_page,
+                            start,
+                            end,
+                            leads_query.version,
+                            st.session_state["leads_patch_version"],
+                        )
+                        if server_side
+                        else None
+                    ),
+                    prefetch_page=prefetch_vtal_summaries,
+                    page_query_key=(
+                        start,
+                        end,
+                        leads_query.version,
+                        st.session_state["leads_patch_version"],
+                    ),
+                )
+            with right_pannel:
+                build_detailed_lead_display(
+                    df_leads,
+                    load_row=partial(
+                        load_lead_row,
+                        version=leads_query.version,
+                        patch_version=st.session_state["leads_patch_version"],
+                    ),
+                    load_detail=get_lead_detail,
+                    render_general=build_general_info_for_lead,
+                    render_first_analysis=partial(
+                        build_first_analysis_info_for_lead,
+                        db_engine=db_engine,
+                    ),
+                    render_detailed_analysis=partial(
+                        build_detailed_analysis_info_for_lead,
+                        db_engine=db_engine,
+                    ),
+                    render_audit=build_audit_structure,
+                )
+                flush_audit_step_decisions(db_engine=db_engine)
+
+    if "admin" in user_roles():
+        with st.sidebar:
+            build_timing_panel()
+
 else:
     st.write(st.session_state.get("authentication_status"))
@@ -0,0 +1,23 @@
+"""
+Refresh the per-address V.Tal churn summary (materialized view vtal_address_churn_summary).
+Schedule it after the V.Tal tables are loaded (e.g. daily cron).
+
+Usage: DB_URL=... python refresh_vtal_summary.py
+"""
+
+from __future__ import annotations
+
+import time
+
+from db.factory import create_db_engine
+from db.repos.vtal_repo import refresh_vtal_churn_summary
+
+
+def main() -> None:
+    t0 = time.perf_counter()
+    refresh_vtal_churn_summary(create_db_engine())
+    print(f"vtal_address_churn_summary atualizada em {time.perf_counter() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
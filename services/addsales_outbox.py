@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy.engine import Engine
+
+from clients.addsales_client import RETRY_STATUSES, AddSalesClient, AddSalesError, AddSalesUnavailableError
+from db.repos import outbox_repo
+
+
+MAX_ATTEMPTS = 8
+RETRY_BASE_S = 5
+RETRY_MAX_S = 15 * 60
+
+
+def retry_delay_s(attempts: int) -> float:
+    """
+    Exponential backoff between deliveries of the same message (5 s, 10 s, 20 s ... 15 min).
+    """
+    return min(RETRY_BASE_S * 2 ** max(attempts - 1, 0), RETRY_MAX_S)
+
+
+class OutboxSender:
+    """
+    Background sender of the AddSales outbox (see outbox_repo).
+
+    A daemon thread claims due messages in batches and delivers them concurrently
+    through a bounded pool; failures are retried with backoff up to MAX_ATTEMPTS,
+    except rejected requests (4xx), which fail for good. Fast failures of an open
+    circuit are retried after the breaker's reset window without using an attempt.
+    Several senders (processes) can run at once: claims use SKIP LOCKED.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        client: AddSalesClient,
+        *,
+        token_getter: Callable[[], Optional[str]] = lambda: os.getenv("ADDSALES_TOKEN"),
+        batch_size: int = 20,
+        concurrency: int = 4,
+        poll_interval_s: float = 5.0,
+        lease_s: int = 120,
+    ) -> None:
+        self.engine = engine
+        self.client = client
+        self.token_getter = token_getter
+        self.batch_size = batch_size
+        self.poll_interval_s = poll_interval_s
+        self.lease_s = lease_s
+
+        self._pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="addsales-outbox")
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "OutboxSender":
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="addsales-outbox-sender", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout_s: Optional[float] = None) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout_s)
+        self._pool.shutdown(wait=True)
+
+    def wake(self) -> None:
+        """
+        Deliver now instead of waiting for the next poll (call after queueing).
+        """
+        self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                processed = self.drain_once()
+            except Exception:
+                # Database unavailable: keep the thread alive and try again on the next poll.
+                processed = 0
+
+            if processed < self.batch_size:
+                self._wake.wait(self.poll_interval_s)
+                self._wake.clear()
+
+    def drain_once(self) -> int:
+        """
+        Claim one batch of due messages and deliver it. Returns the number of messages handled.
+        """
+        messages = outbox_repo.claim_messages(self.engine, limit=self.batch_size, lease_s=self.lease_s)
+        for future in [self._pool.submit(self._deliver, message) for message in messages]:
+            future.result()
+        return len(messages)
+
+    @staticmethod
+    def _retry_in_s(exc: AddSalesError, attempts: int) -> Optional[float]:
+        """
+        Backoff before the next delivery, or None to give up: AddSales rejected the
+        request itself (4xx other than 429) or the attempt budget is spent.
+        """
+        if exc.status_code is not None and exc.status_code not in RETRY_STATUSES:
+            return None
+        if attempts >= MAX_ATTEMPTS:
+            return None
+        return retry_delay_s(attempts)
+
+    def _deliver(self, message: Dict[str, Any]) -> None:
+        token = self.token_getter()
+
+        try:
+            if not token:
+                raise AddSalesError("Token AddSales não encontrado")
+
+            response = self.client.update_lead(
+                token=token,
+                addsales_code=message["addsales_code"],
+                payload=message["payload"],
+                headers={
+                    "Content-Type": "application/json",
+                    "Idempotency-Key": message["idempotency_key"],
+                },
+            )
+        except AddSalesUnavailableError as exc:
+            # Open circuit: nothing was sent, so the claim does not count as an attempt;
+            # try again once the breaker lets a trial call through.
+            outbox_repo.mark_failed(
+                self.engine,
+                outbox_id=message["outbox_id"],
+                error=str(exc),
+                retry_in_s=self.client.breaker.reset_timeout_s,
+                refund_attempt=True,
+            )
+            return
+        except AddSalesError as exc:
+            outbox_repo.mark_failed(
+                self.engine,
+                outbox_id=message["outbox_id"],
+                error=str(exc),
+                retry_in_s=self._retry_in_s(exc, message["attempts"]),
+            )
+            return
+
+        outbox_repo.mark_sent(self.engine, outbox_id=message["outbox_id"], response_status=response.status_code)
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+from datetime import date
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+
+# Audit steps with automatic rules (hzn_{step}_result).
+RULE_STEPS = ("serpro", "serasa", "court_case", "corp_doc", "address_info")
+# Steps whose rules can approve a lead on their own (the others only reject).
+APPROVING_RULE_STEPS = ("serpro", "serasa", "court_case")
+
+SERASA_MAX_DEBT = 100
+SERASA_MIN_SCORE = 450
+COURT_MAX_ACTIVE_CASES = 4
+CNPJ_MIN_AGE_DAYS = 90
+VTAL_UNAVAILABLE_CODE = 2
+
+
+def _json_path(values: pd.Series, *keys: str) -> pd.Series:
+    """
+    Value at `keys` inside each dict of `values` (None when any level is missing).
+    """
+    def dig(value: Any) -> Any:
+        for key in keys:
+            if not isinstance(value, dict):
+                return None
+            value = value.get(key)
+        return value
+
+    return pd.Series([dig(v) for v in values], index=values.index, dtype=object)
+
+
+def _column(df: pd.DataFrame, name: str) -> pd.Series:
+    return df[name] if name in df.columns else pd.Series(None, index=df.index, dtype=object)
+
+
+def _decide(index: pd.Index, approved: pd.Series, rejected: pd.Series) -> pd.Series:
+    decision = np.select(
+        [rejected.to_numpy(dtype=bool), approved.to_numpy(dtype=bool)],
+        ["reprovado", "aprovado"],
+        default=None,
+    )
+    return pd.Series(decision, index=index, dtype=object)
+
+
+def evaluate_audit_rules(df: pd.DataFrame, today: Optional[date] = None) -> pd.DataFrame:
+    """
+    Automatic audit decisions for every lead of `df` (full lead rows, see lead_repo.fetch_leads).
+    Returns one column per RULE_STEPS entry, aligned with `df`:
+    "aprovado", "reprovado" or None when the step needs a human.
+    """
+    today = pd.Timestamp(today or date.today())
+    decisions = pd.DataFrame(index=df.index)
+
+    # Serasa / Serpro: CPF status, then debt and score.
+    cpf_status = _column(df, "statusregistration")
+    has_cpf_status = cpf_status.notna()
+    regular_cpf = cpf_status == "REGULAR"
+
+    debt = pd.to_numeric(
+        _json_path(_column(df, "serasa_json"), "negativeData", "pefin", "summary", "balance"),
+        errors="coerce",
+    )
+    score = pd.to_numeric(_column(df, "credit_score"), errors="coerce")
+    high_debt = debt > SERASA_MAX_DEBT
+
+    decisions["serpro"] = _decide(df.index, regular_cpf, has_cpf_status & ~regular_cpf)
+    decisions["serasa"] = _decide(
+        df.index,
+        regular_cpf & ~high_debt & (score >= SERASA_MIN_SCORE),
+        regular_cpf & high_debt,
+    )
+
+    # Escavador: criminal cases reject, few active cases approve.
+    criminal_cases = _column(df, "active_criminal_cases").map(
+        lambda cases: len(cases) if isinstance(cases, (list, tuple, dict)) else 0
+    )
+    active_cases = pd.to_numeric(_column(df, "active_cases_as_defendant"), errors="coerce").fillna(0)
+
+    decisions["court_case"] = _decide(
+        df.index,
+        (criminal_cases == 0) & (active_cases <= COURT_MAX_ACTIVE_CASES),
+        criminal_cases > 0,
+    )
+
+    # CNPJ: only leads with a CNPJ; invalid, inactive or younger than 90 days reject.
+    has_cnpj = _column(df, "cnpj").notna()
+    cnpj_json = _column(df, "cnpj_json")
+    opening_date = pd.to_datetime(
+        _json_path(cnpj_json, "data_inicio_atividade"),
+        errors="coerce",
+        format="%Y-%m-%d",
+    )
+    too_young = (today - opening_date).dt.days < CNPJ_MIN_AGE_DAYS
+    inactive = _json_path(cnpj_json, "descricao_situacao_cadastral") != "ATIVA"
+
+    decisions["corp_doc"] = _decide(
+        df.index,
+        pd.Series(False, index=df.index),
+        has_cnpj & (_column(df, "doc_situation").isna() | too_young | inactive),
+    )
+
+    # V.Tal availability: "unavailable" rejects the address.
+    availability_code = pd.to_numeric(
+        _json_path(_column(df, "vtal_availability"), "resource", "availabilityCode"),
+        errors="coerce",
+    )
+    decisions["address_info"] = _decide(
+        df.index,
+        pd.Series(False, index=df.index),
+        availability_code == VTAL_UNAVAILABLE_CODE,
+    )
+
+    return decisions
+
+
+def evaluate_lead_rules(lead: Dict[str, Any], today: Optional[date] = None) -> Dict[str, Optional[str]]:
+    """
+    evaluate_audit_rules for a single lead dict.
+    """
+    return evaluate_audit_rules(pd.DataFrame([lead]), today=today).iloc[0].to_dict()
+
+
+def clean_leads_mask(df: pd.DataFrame, today: Optional[date] = None) -> pd.Series:
+    """
+    True for the leads of `df` the rules mark clean: every APPROVING_RULE_STEPS step
+    approved, no rule rejecting, and no step already rejected by an auditor.
+    """
+    decisions = evaluate_audit_rules(df, today=today)
+
+    approved = (decisions[list(APPROVING_RULE_STEPS)] == "aprovado").all(axis=1)
+    rejected_by_rule = (decisions == "reprovado").any(axis=1)
+
+    step_columns = [
+        column for column in df.columns
+        if column.startswith("hzn_") and column.endswith("_result") and column != "hzn_final_result"
+    ]
+    rejected_by_auditor = (df[step_columns] == "reprovado").any(axis=1)
+
+    return approved & ~rejected_by_rule & ~rejected_by_auditor
@@ -1,17 +1,30 @@
 from __future__ import annotations
 
+import uuid
 from dataclasses import dataclass
-from typing import Optional
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
 
+import pandas as pd
 from sqlalchemy.engine import Engine
 
 from db.repos import lead_repo
+from services.audit_rules import RULE_STEPS, clean_leads_mask, evaluate_audit_rules
+
+
+AUDIT_DECISIONS = {"aprovado", "pendente", "reprovado"}
+
+# What a bulk-audit candidate keeps between search and approval: the listing
+# (name, cpf, lead_dt) and the AddSales submission (see build_addsales_payload).
+BULK_AUDIT_COLUMNS = ["lead_id", "name", "cpf", "lead_dt", "addsales_code"]
 
 
 @dataclass(frozen=True)
 class AuditResult:
     ok: bool
     message: str = ""
+    values: Optional[Dict[str, Any]] = None
+    skipped: bool = False
 
 
 def set_audit_step_decision(
@@ -31,16 +44,132 @@ def set_audit_step_decision(
     if field_suffix not in valid_suffixes:
         return AuditResult(False, f"suffix inválido: {field_suffix!r}")
 
-    if decision not in {"Aprovado", "Pendente", "Reprovado"}:
+    decision = str(decision or "").lower()
+    if decision not in AUDIT_DECISIONS:
         return AuditResult(False, f"decisão inválida: {decision!r}")
 
-    lead_repo.update_audit_step(
+    values = lead_repo.update_audit_step(
         engine,
         lead_id=lead_id,
         field_suffix=field_suffix,
         decision=decision,
     )
-    return AuditResult(True)
+    if values is None:
+        return AuditResult(False, f"lead não encontrado: {lead_id!r}")
+
+    return AuditResult(True, values=values)
+
+
+def set_audit_step_decisions(
+    engine: Engine,
+    *,
+    decisions: Dict[str, Dict[str, str]],
+    valid_suffixes: set[str],
+) -> AuditResult:
+    """
+    Validate + persist several audit steps ({lead_id: {suffix: decision}}) in one transaction.
+    On success, `values` holds the persisted columns by lead_id.
+    """
+    normalized: Dict[str, Dict[str, str]] = {}
+
+    for lead_id, steps in decisions.items():
+        if not lead_id:
+            return AuditResult(False, "lead_id vazio")
+
+        for field_suffix, decision in steps.items():
+            if field_suffix not in valid_suffixes:
+                return AuditResult(False, f"suffix inválido: {field_suffix!r}")
+
+            decision = str(decision or "").lower()
+            if decision not in AUDIT_DECISIONS:
+                return AuditResult(False, f"decisão inválida: {decision!r}")
+
+            normalized.setdefault(lead_id, {})[field_suffix] = decision
+
+    values = lead_repo.update_audit_steps(engine, normalized)
+
+    missing = [lead_id for lead_id in normalized if lead_id not in values]
+    if missing:
+        return AuditResult(False, f"lead não encontrado: {missing[0]!r}", values=values)
+
+    return AuditResult(True, values=values)
+
+
+def set_audit_step_decisions_bulk(
+    engine: Engine,
+    *,
+    field_suffix: str,
+    decisions: Dict[str, str],
+    valid_suffixes: set[str],
+    batch_size: int = 1000,
+) -> AuditResult:
+    """
+    Validate + persist one audit step for many leads ({lead_id: decision}) with batched UPDATEs.
+    On success, `values["updated"]` holds the number of changed rows.
+    """
+    if field_suffix not in valid_suffixes:
+        return AuditResult(False, f"suffix inválido: {field_suffix!r}")
+
+    normalized: Dict[str, str] = {}
+    for lead_id, decision in decisions.items():
+        if not lead_id:
+            return AuditResult(False, "lead_id vazio")
+
+        decision = str(decision or "").lower()
+        if decision not in AUDIT_DECISIONS:
+            return AuditResult(False, f"decisão inválida: {decision!r}")
+
+        normalized[lead_id] = decision
+
+    updated = lead_repo.update_audit_step_bulk(
+        engine,
+        field_suffix=field_suffix,
+        decisions=normalized,
+        batch_size=batch_size,
+    )
+    return AuditResult(True, values={"updated": updated})
+
+
+def auto_audit_leads(
+    engine: Engine,
+    *,
+    d_start: date,
+    d_end: date,
+    batch_size: int = 1000,
+) -> Dict[str, int]:
+    """
+    Evaluate the automatic audit rules for every lead in the range and store the
+    decisions that differ from the persisted ones.
+    Returns counters: leads, decisions (changed decisions sent) and updated (rows written).
+    """
+    df = lead_repo.fetch_leads(engine, d_start=d_start, d_end=d_end)
+    stats = {"leads": len(df), "decisions": 0, "updated": 0}
+    if df.empty:
+        return stats
+
+    rules = evaluate_audit_rules(df)
+
+    for step in RULE_STEPS:
+        decision = rules[step]
+        changed = decision.notna() & (decision != df[f"hzn_{step}_result"])
+        if not changed.any():
+            continue
+
+        step_decisions = dict(zip(df.loc[changed, "lead_id"], decision[changed]))
+        result = set_audit_step_decisions_bulk(
+            engine,
+            field_suffix=step,
+            decisions=step_decisions,
+            valid_suffixes=set(RULE_STEPS),
+            batch_size=batch_size,
+        )
+        if not result.ok:
+            raise ValueError(result.message)
+
+        stats["decisions"] += len(step_decisions)
+        stats["updated"] += result.values["updated"]
+
+    return stats
 
 
 def set_final_audit_result(
@@ -58,7 +187,8 @@ def set_final_audit_result(
     if not lead_id:
         return AuditResult(False, "lead_id vazio")
 
-    if decision not in {"Aprovado", "Pendente", "Reprovado"}:
+    decision = str(decision or "").lower()
+    if decision not in AUDIT_DECISIONS:
         return AuditResult(False, f"decisão inválida: {decision!r}")
 
     # Optional light normalization (no behavior change)
@@ -67,11 +197,147 @@ def set_final_audit_result(
 
     # Optional consistency: only allow note in its matching state
     # (Keep permissive to avoid breaking flows; can harden later.)
-    lead_repo.update_audit_result(
+    values = lead_repo.update_audit_result(
+        engine,
+        lead_id=lead_id,
+        decision=decision,
+        pending_obs=pending_obs,
+        denied_obs=denied_obs,
+    )
+    if values is None:
+        return AuditResult(False, f"lead não encontrado: {lead_id!r}")
+
+    return AuditResult(True, values=values)
+
+
+def build_addsales_payload(
+    lead: Dict[str, Any],
+    *,
+    decision: str,
+    pending_obs: Optional[str],
+    denied_obs: Optional[str],
+) -> Dict[str, Any]:
+    """
+    Body of the AddSales audit result update.
+    """
+    return {
+        "codigo_lead_addsales": lead["addsales_code"],
+        "cpf": lead["cpf"],
+        "data_auditoria": datetime.now().isoformat(),
+        "descricao_pendencias": pending_obs,
+        "motivos_reprovacao": denied_obs,
+        "resultado_auditoria": decision,
+    }
+
+
+def submit_final_audit_result(
+    engine: Engine,
+    *,
+    lead: Dict[str, Any],
+    decision: str,
+    pending_obs: Optional[str] = None,
+    denied_obs: Optional[str] = None,
+) -> AuditResult:
+    """
+    Final audit decision with notes, plus its AddSales submission queued in the
+    outbox (same transaction). Delivery happens in the background
+    (services.addsales_outbox.OutboxSender).
+    """
+    lead_id = lead.get("lead_id")
+    if not lead_id:
+        return AuditResult(False, "lead_id vazio")
+
+    addsales_code = lead.get("addsales_code")
+    if addsales_code is None or not str(addsales_code):
+        return AuditResult(False, "addsales_code vazio")
+
+    decision = str(decision or "").lower()
+    if decision not in AUDIT_DECISIONS:
+        return AuditResult(False, f"decisão inválida: {decision!r}")
+
+    pending_obs = (pending_obs or "").strip() or None
+    denied_obs = (denied_obs or "").strip() or None
+
+    values = lead_repo.update_audit_result_with_outbox(
         engine,
         lead_id=lead_id,
         decision=decision,
         pending_obs=pending_obs,
         denied_obs=denied_obs,
+        addsales_code=str(addsales_code),
+        payload=build_addsales_payload(
+            lead,
+            decision=decision,
+            pending_obs=pending_obs,
+            denied_obs=denied_obs,
+        ),
+        idempotency_key=uuid.uuid4().hex,
     )
-    return AuditResult(True)
\ No newline at end of file
+    if values is None:
+        return AuditResult(False, f"lead não encontrado: {lead_id!r}")
+
+    return AuditResult(True, values=values)
+
+
+def find_clean_auditable_leads(engine: Engine, *, d_start: date, d_end: date) -> pd.DataFrame:
+    """
+    Leads waiting for the final audit in the range that the rules mark clean
+    (see audit_rules.clean_leads_mask), reduced to BULK_AUDIT_COLUMNS.
+    """
+    df = lead_repo.fetch_auditable_leads(engine, d_start=d_start, d_end=d_end)
+    if df.empty:
+        return df.reindex(columns=BULK_AUDIT_COLUMNS)
+
+    return df.loc[clean_leads_mask(df), BULK_AUDIT_COLUMNS].reset_index(drop=True)
+
+
+def submit_final_audit_results(
+    engine: Engine,
+    *,
+    leads: List[Dict[str, Any]],
+    decision: str,
+) -> Dict[str, AuditResult]:
+    """
+    submit_final_audit_result for many leads (same decision, no notes): one batched
+    UPDATE plus their outbox rows in one transaction. Returns one outcome per lead_id;
+    leads no longer awaiting audit (decided meanwhile) or gone are `skipped`.
+    """
+    decision = str(decision or "").lower()
+    outcomes: Dict[str, AuditResult] = {}
+    submissions = []
+
+    for lead in leads:
+        lead_id = lead.get("lead_id")
+        if not lead_id:
+            continue
+
+        addsales_code = lead.get("addsales_code")
+        if decision not in AUDIT_DECISIONS:
+            outcomes[str(lead_id)] = AuditResult(False, f"decisão inválida: {decision!r}")
+        elif addsales_code is None or not str(addsales_code):
+            outcomes[str(lead_id)] = AuditResult(False, "addsales_code vazio")
+        else:
+            submissions.append(
+                {
+                    "lead_id": lead_id,
+                    "decision": decision,
+                    "pending_obs": None,
+                    "denied_obs": None,
+                    "addsales_code": str(addsales_code),
+                    "payload": build_addsales_payload(lead, decision=decision, pending_obs=None, denied_obs=None),
+                    "idempotency_key": uuid.uuid4().hex,
+                }
+            )
+
+    updated = lead_repo.update_audit_results_with_outbox(engine, submissions)
+
+    for submission in submissions:
+        lead_id = str(submission["lead_id"])
+        values = updated.get(lead_id)
+        outcomes[lead_id] = (
+            AuditResult(True, values=values)
+            if values is not None
+            else AuditResult(False, "lead já auditado ou não encontrado", skipped=True)
+        )
+
+    return outcomes
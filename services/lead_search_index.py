@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+
+class NGramIndex:
+    """
+    In-memory n-gram index over a string column, for substring search.
+
+    Each gram maps to the sorted row positions containing it; a query intersects
+    the posting lists of its grams and only verifies the surviving candidates.
+    Queries shorter than `n` fall back to a linear scan.
+    """
+
+    # Grams are packed into one int64 (21 bits per Unicode code point).
+    _BITS = 21
+
+    def __init__(self, values: pd.Series, n: int = 3) -> None:
+        if not 1 <= n <= 3:
+            raise ValueError(f"n must be between 1 and 3, got {n}")
+
+        self.n = n
+        self._values = values.fillna("").astype(str).reset_index(drop=True)
+        self._postings = self._build_postings(self._values, n)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def _gram_code(self, gram: str) -> int:
+        code = 0
+        for char in gram:
+            code = (code << self._BITS) | ord(char)
+        return code
+
+    @classmethod
+    def _build_postings(cls, values: pd.Series, n: int) -> Dict[int, np.ndarray]:
+        lengths = values.str.len().to_numpy()
+        if len(values) == 0 or lengths.max() < n:
+            return {}
+
+        max_len = int(lengths.max())
+        code_points = values.to_numpy(dtype=f"U{max_len}").view(np.uint32).reshape(len(values), max_len)
+        positions = np.arange(len(values))
+
+        gram_codes, gram_positions = [], []
+        for offset in range(max_len - n + 1):
+            valid = lengths >= offset + n
+            code = np.zeros(int(valid.sum()), dtype=np.int64)
+            for k in range(n):
+                code = (code << cls._BITS) | code_points[valid, offset + k]
+            gram_codes.append(code)
+            gram_positions.append(positions[valid])
+
+        dense_codes, uniques = pd.factorize(np.concatenate(gram_codes))
+        keys = np.sort(dense_codes.astype(np.int64) * len(values) + np.concatenate(gram_positions))
+        keys = keys[np.r_[True, keys[1:] != keys[:-1]]]
+
+        dense_codes, pos_values = np.divmod(keys, len(values))
+        starts = np.flatnonzero(np.r_[True, dense_codes[1:] != dense_codes[:-1]])
+        return dict(zip(uniques[dense_codes[starts]].tolist(), np.split(pos_values, starts[1:])))
+
+    def search(self, query: str) -> np.ndarray:
+        """
+        Sorted positions of the values containing `query`.
+        """
+        n = self.n
+        if len(query) < n:
+            return np.flatnonzero(self._values.str.contains(query, regex=False).to_numpy())
+
+        postings = []
+        for gram in {query[i:i + n] for i in range(len(query) - n + 1)}:
+            posting = self._postings.get(self._gram_code(gram))
+            if posting is None:
+                return np.empty(0, dtype=np.int64)
+            postings.append(posting)
+
+        postings.sort(key=len)
+        candidates = postings[0]
+        for posting in postings[1:]:
+            candidates = np.intersect1d(candidates, posting, assume_unique=True)
+            if len(candidates) == 0:
+                return candidates
+
+        if len(query) == n:
+            return candidates
+
+        matches = self._values.iloc[candidates].str.contains(query, regex=False).to_numpy()
+        return candidates[matches]
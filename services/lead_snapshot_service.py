@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import unicodedata
+from datetime import date
+from typing import Any, Dict
+
+import pandas as pd
+
+from services.lead_status_service import define_lead_status
+
+
+SEARCH_KEY_COLUMNS = ("search_name", "search_cpf", "search_cep")
+
+
+def fold_text(value: str) -> str:
+    """
+    Lowercase and strip accents, matching the search_name key.
+    """
+    normalized = unicodedata.normalize("NFKD", str(value))
+    return normalized.encode("ascii", "ignore").decode("ascii").lower()
+
+
+def _fold_series(s: pd.Series) -> pd.Series:
+    return (
+        s.fillna("")
+        .astype(str)
+        .str.normalize("NFKD")
+        .str.encode("ascii", "ignore")
+        .str.decode("ascii")
+        .str.lower()
+    )
+
+
+def _digits_series(s: pd.Series) -> pd.Series:
+    return s.fillna("").astype(str).str.replace(r"\D", "", regex=True)
+
+
+def add_search_keys(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Add the normalized keys used by the lead list filters, in place:
+    search_name (lowercase, no accents), search_cpf and search_cep (digits only).
+    """
+    df["search_name"] = _fold_series(df["name"])
+    df["search_cpf"] = _digits_series(df["cpf"])
+    df["search_cep"] = _digits_series(df["vtal_zip_code"])
+    return df
+
+
+def merge_leads_delta(
+    snapshot: pd.DataFrame,
+    delta: pd.DataFrame,
+    d_start: date,
+    d_end: date,
+) -> pd.DataFrame:
+    """
+    Replace/append the changed leads of `delta` into `snapshot` by lead_id.
+    Changed leads whose lead_dt is now outside [d_start, d_end] are removed.
+    Both frames must already be formatted (fmt + status).
+    """
+    if delta is None or len(delta) == 0:
+        return snapshot
+
+    kept = snapshot[~snapshot["lead_id"].isin(delta["lead_id"])]
+    lead_dt = pd.to_datetime(delta["lead_dt"])
+    if lead_dt.dt.tz is not None:
+        lead_dt = lead_dt.dt.tz_localize(None)
+    # Same bounds as `lead_dt BETWEEN :d_start AND :d_end` in fetch_lead_list.
+    in_range = lead_dt.between(pd.Timestamp(d_start), pd.Timestamp(d_end))
+    merged = pd.concat([kept, delta[in_range.to_numpy()]], ignore_index=True)
+    return merged.sort_values("lead_dt", ascending=False)
+
+
+def lead_positions(df: pd.DataFrame) -> Dict[Any, int]:
+    """
+    lead_id -> row position of the snapshot.
+    """
+    return dict(zip(df["lead_id"], range(len(df))))
+
+
+def patch_lead_row(df: pd.DataFrame, position: int, values: Dict[str, Any]) -> None:
+    """
+    Apply persisted column values to the lead at `position`, in place,
+    and recompute its status.
+    """
+    label = df.index[position]
+
+    for column, value in values.items():
+        df.loc[label, column] = value
+
+    if "status" in df.columns:
+        df.loc[label, "status"] = define_lead_status(df.loc[label])
@@ -1,14 +1,30 @@
 from __future__ import annotations
 
+import numpy as np
+import pandas as pd
+
+
+# Every value define_lead_status can return, in display (sorted) order.
+LEAD_STATUSES = [
+    "Aprovado",
+    "Aprovado - Auditoria",
+    "Em Negociação - AddSales",
+    "Necessária auditoria",
+    "Pendente - Auditoria",
+    "Reprovado - AddSales",
+    "Reprovado - Auditoria",
+]
+
 
 def define_lead_status(row):
     """
     Define lead status based on audit and AddSales fields.
-    Logic moved verbatim from UI layer (no behavior change).
+    Logic moved verbatim from UI layer; a missing (None/NaN) hzn_audit means
+    not audited and a missing hzn_final_result means no decision yet.
     """
-    
-    if row['hzn_audit']:
-        if row['hzn_final_result'] is None:
+
+    if not pd.isna(row['hzn_audit']) and row['hzn_audit']:
+        if pd.isna(row['hzn_final_result']):
             return 'Necessária auditoria'
         else:
             return f"{row['hzn_final_result'].title()} - Auditoria"
@@ -19,4 +35,32 @@ def define_lead_status(row):
     if row['homeativo_status'] == 'Reprovado':
         return 'Reprovado - AddSales'
 
-    return 'Em Negociação - AddSales'
\ No newline at end of file
+    return 'Em Negociação - AddSales'
+
+
+def define_lead_status_frame(df: pd.DataFrame) -> pd.Series:
+    """
+    Column-wise define_lead_status: same outputs for every row of `df`.
+    """
+    audit = df["hzn_audit"].notna() & df["hzn_audit"].astype(bool)
+    final_result = df["hzn_final_result"]
+    homeativo_status = df["homeativo_status"]
+
+    audited_status = final_result.astype("string").str.title() + " - Auditoria"
+
+    status = np.select(
+        [
+            audit & final_result.isna(),
+            audit,
+            homeativo_status == "Venda aprovada",
+            homeativo_status == "Reprovado",
+        ],
+        [
+            "Necessária auditoria",
+            audited_status.astype(object),
+            "Aprovado",
+            "Reprovado - AddSales",
+        ],
+        default="Em Negociação - AddSales",
+    )
+    return pd.Series(status, index=df.index, dtype=object)
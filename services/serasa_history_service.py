@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import csv
+import json
+from typing import Any, List, Optional
+
+import pandas as pd
+
+
+def _strip_delimiters(text: str, open_char: str, close_char: str) -> str:
+    text = text.strip()
+    if text[:1] == open_char and text[-1:] == close_char:
+        return text[1:-1]
+    return text
+
+
+def _parse_pg_composite_array(text: str) -> List[List[Optional[str]]]:
+    """
+    Fields of each record of a Postgres composite-array literal
+    ({"(\\"Rua A, 12\\",2020-01-02)",...}), honouring quotes, so commas inside
+    quoted fields are kept. Empty fields come back as None.
+    """
+    inner = _strip_delimiters(text, "{", "}")
+    if not inner:
+        return []
+
+    # Array level: elements are double-quoted with backslash escapes.
+    elements = next(csv.reader([inner], escapechar="\\", doublequote=False))
+
+    # Record level: fields are double-quoted with doubled quotes.
+    records = csv.reader(
+        (_strip_delimiters(element, "(", ")") for element in elements if element.upper() != "NULL"),
+        doublequote=True,
+    )
+    return [[field or None for field in record] for record in records]
+
+
+def _history_rows(raw: Any) -> List[List[Any]]:
+    """
+    (value, date) pairs from a Serasa history column: JSON (to_json of the composite
+    array, a list of objects) or the legacy composite-array text.
+    """
+    if raw is None:
+        return []
+
+    if isinstance(raw, str):
+        stripped = raw.strip()
+        if stripped.startswith("["):
+            raw = json.loads(stripped)
+        else:
+            raw = _parse_pg_composite_array(stripped)
+
+    rows = [list(item.values()) if isinstance(item, dict) else list(item) for item in raw]
+    return [(row + [None, None])[:2] for row in rows]
+
+
+def parse_registered_history(raw: Any, value_column: str) -> pd.DataFrame:
+    """
+    Typed frame of a Serasa address/phone history (`value_column`, "Data de registro"),
+    newest first. Accepts the JSON arrays returned by lead_repo or the legacy text format.
+    """
+    rows = _history_rows(raw)
+    df = pd.DataFrame(rows, columns=[value_column, "Data de registro"], dtype=object)
+    df["Data de registro"] = pd.to_datetime(df["Data de registro"], errors="coerce")
+
+    df = df.sort_values(by="Data de registro", ascending=False, kind="stable").reset_index(drop=True)
+    df.index = df.index + 1
+    return df
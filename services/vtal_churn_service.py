@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date
+from typing import Optional
+
+import pandas as pd
+
+
+CHURN_WINDOW_MONTHS = 24
+VOL_CHURN_MAX_MONTH = 3
+INVOL_CHURN_MAX_MONTH = 6
+
+
+@dataclass(frozen=True)
+class ChurnAnalysis:
+    vol_history: pd.DataFrame
+    invol_history: pd.DataFrame
+    active_client: bool
+    vol_churn_3m: bool
+    invol_churn_6m: bool
+
+
+def prepare_vtal_history(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Parse the V.Tal history columns once, in place (see vtal_repo.fetch_vtal_history):
+    "Data - Retirada" as datetime and "Mês Churn" ("M3") as a nullable integer.
+    """
+    df["Data - Retirada"] = pd.to_datetime(df["Data - Retirada"], errors="coerce")
+    df["Mês Churn"] = pd.to_numeric(
+        df["Mês Churn"].astype("string").str.replace(r"\D", "", regex=True),
+        errors="coerce",
+    ).astype("Int64")
+    return df
+
+
+def analyze_churn_history(df: pd.DataFrame, today: Optional[date] = None) -> ChurnAnalysis:
+    """
+    VOL / INVOL churns of the last 24 months and the V.Tal verdicts, in one pass
+    over a history prepared by prepare_vtal_history.
+    """
+    cutoff = pd.Timestamp(today or date.today()) - pd.DateOffset(months=CHURN_WINDOW_MONTHS)
+
+    in_window = (df["Data - Retirada"] >= cutoff).to_numpy()
+    churn_type = df["Tipo Churn"].to_numpy()
+    churn_month = df["Mês Churn"]
+
+    vol = in_window & (churn_type == "voluntario")
+    invol = in_window & (churn_type == "involuntario")
+
+    return ChurnAnalysis(
+        vol_history=df[vol],
+        invol_history=df[invol],
+        active_client=bool((df["Status - V.Tal"] == "hc_ativo").any()),
+        vol_churn_3m=bool((churn_month[vol] <= VOL_CHURN_MAX_MONTH).any()),
+        invol_churn_6m=bool((churn_month[invol] <= INVOL_CHURN_MAX_MONTH).any()),
+    )
@@ -0,0 +1,19 @@
+import pytest
+
+from benchmarks.addsales_stand_in import StandInConfig, serve
+
+
+@pytest.fixture
+def stand_in():
+    servers = []
+
+    def start(**config):
+        server = serve(StandInConfig(**config))
+        servers.append(server)
+        return server
+
+    yield start
+
+    for server in servers:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,101 @@
+import time
+
+import pytest
+
+from clients.addsales_client import AddSalesClient, AddSalesError, AddSalesUnavailableError
+
+
+PAYLOAD = {"codigo_lead_addsales": 1, "resultado_auditoria": "aprovado"}
+
+
+def _client(server, **kwargs) -> AddSalesClient:
+    kwargs.setdefault("backoff_factor", 0)
+    return AddSalesClient(base_url=server.base_url, timeout_s=5, **kwargs)
+
+
+def _update_lead(client: AddSalesClient):
+    return client.update_lead(token="stand-in", addsales_code="1", payload=PAYLOAD)
+
+
+def test_5xx_is_retried_until_success(stand_in):
+    server = stand_in(fail_first=2)
+    client = _client(server, max_retries=3)
+
+    response = _update_lead(client)
+
+    assert response.status_code == 200
+    assert server.stats.by_status == {503: 2, 200: 1}
+    assert client.breaker.state == "closed"
+
+
+def test_5xx_after_retries_raises(stand_in):
+    server = stand_in(error_rate=1.0)
+    client = _client(server, max_retries=2)
+
+    with pytest.raises(AddSalesError, match="retornou 503"):
+        _update_lead(client)
+
+    assert server.stats.requests == 3
+
+
+def test_429_honours_retry_after(stand_in):
+    server = stand_in(rate_limit=1)
+    client = _client(server, max_retries=3)
+
+    _update_lead(client)
+    t0 = time.monotonic()
+    response = _update_lead(client)
+    elapsed = time.monotonic() - t0
+
+    assert response.status_code == 200
+    assert server.stats.by_status == {200: 2, 429: 1}
+    # The stand-in answers Retry-After: 1 and backoff_factor is 0.
+    assert elapsed >= 0.9
+
+
+def test_breaker_opens_after_failure_threshold(stand_in):
+    server = stand_in(error_rate=1.0)
+    client = _client(server, max_retries=0, failure_threshold=3, reset_timeout_s=60)
+
+    for _ in range(3):
+        with pytest.raises(AddSalesError, match="retornou 503"):
+            _update_lead(client)
+
+    assert client.breaker.state == "open"
+    with pytest.raises(AddSalesUnavailableError):
+        _update_lead(client)
+    assert server.stats.requests == 3
+
+
+def test_breaker_half_open_recovers_on_success(stand_in):
+    server = stand_in(error_rate=1.0)
+    client = _client(server, max_retries=0, failure_threshold=2, reset_timeout_s=0.2)
+
+    for _ in range(2):
+        with pytest.raises(AddSalesError):
+            _update_lead(client)
+    assert client.breaker.state == "open"
+
+    server.config.error_rate = 0.0
+    time.sleep(0.25)
+    assert client.breaker.state == "half-open"
+
+    assert _update_lead(client).status_code == 200
+    assert client.breaker.state == "closed"
+    assert server.stats.by_status == {503: 2, 200: 1}
+
+
+def test_breaker_half_open_trial_failure_reopens(stand_in):
+    server = stand_in(error_rate=1.0)
+    client = _client(server, max_retries=0, failure_threshold=2, reset_timeout_s=0.2)
+
+    for _ in range(2):
+        with pytest.raises(AddSalesError):
+            _update_lead(client)
+
+    time.sleep(0.25)
+    with pytest.raises(AddSalesError, match="retornou 503"):
+        _update_lead(client)
+
+    assert client.breaker.state == "open"
+    assert server.stats.requests == 3
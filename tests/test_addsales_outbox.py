@@ -0,0 +1,131 @@
+import time
+
+import pytest
+
+from clients.addsales_client import AddSalesClient
+from db.repos import outbox_repo
+from services.addsales_outbox import MAX_ATTEMPTS, OutboxSender, retry_delay_s
+
+
+PAYLOAD = {"codigo_lead_addsales": 1, "resultado_auditoria": "aprovado"}
+
+
+class _OutboxRow:
+    """
+    One addsales_outbox row, updated the way claim_messages / mark_failed / mark_sent do.
+    """
+
+    def __init__(self) -> None:
+        self.status = "pending"
+        self.attempts = 0
+        self.retry_in_s = None
+
+    def claim(self):
+        self.status = "sending"
+        self.attempts += 1
+        return {
+            "outbox_id": 1,
+            "idempotency_key": "outbox-test",
+            "lead_id": "1",
+            "addsales_code": "1",
+            "payload": PAYLOAD,
+            "attempts": self.attempts,
+        }
+
+    def mark_failed(self, engine, *, outbox_id, error, retry_in_s, refund_attempt=False):
+        self.status = "failed" if retry_in_s is None else "pending"
+        self.attempts -= 1 if refund_attempt else 0
+        self.retry_in_s = retry_in_s
+
+    def mark_sent(self, engine, *, outbox_id, response_status):
+        self.status = "sent"
+
+
+@pytest.fixture
+def row(monkeypatch):
+    row = _OutboxRow()
+    monkeypatch.setattr(outbox_repo, "mark_failed", row.mark_failed)
+    monkeypatch.setattr(outbox_repo, "mark_sent", row.mark_sent)
+    return row
+
+
+@pytest.fixture
+def sender_for():
+    senders = []
+
+    def build(server, **client_kwargs):
+        client = AddSalesClient(base_url=server.base_url, timeout_s=5, max_retries=0, **client_kwargs)
+        sender = OutboxSender(None, client, token_getter=lambda: "stand-in", concurrency=1)
+        senders.append(sender)
+        return sender
+
+    yield build
+
+    for sender in senders:
+        sender.stop()
+
+
+def test_open_circuit_does_not_use_up_attempts(stand_in, row, sender_for):
+    server = stand_in(error_rate=1.0)
+    sender = sender_for(server, failure_threshold=1, reset_timeout_s=0.2)
+
+    # First real failure opens the circuit.
+    sender._deliver(row.claim())
+    assert (row.status, row.attempts, row.retry_in_s) == ("pending", 1, retry_delay_s(1))
+
+    # More fast failures than the attempt budget while the circuit is open.
+    for _ in range(MAX_ATTEMPTS + 2):
+        sender._deliver(row.claim())
+        assert (row.status, row.attempts, row.retry_in_s) == ("pending", 1, 0.2)
+
+    # Reset window over: the trial call reaches AddSales and fails once more.
+    time.sleep(0.25)
+    sender._deliver(row.claim())
+
+    assert (row.status, row.attempts, row.retry_in_s) == ("pending", 2, retry_delay_s(2))
+    assert server.stats.requests == 2
+
+
+def test_attempt_budget_still_applies_to_real_failures(stand_in, row, sender_for):
+    server = stand_in(error_rate=1.0)
+    sender = sender_for(server, failure_threshold=100)
+
+    for _ in range(MAX_ATTEMPTS - 1):
+        sender._deliver(row.claim())
+        assert row.status == "pending"
+
+    sender._deliver(row.claim())
+
+    assert (row.status, row.attempts) == ("failed", MAX_ATTEMPTS)
+    assert server.stats.requests == MAX_ATTEMPTS
+
+
+@pytest.mark.parametrize("status", [400, 404, 422])
+def test_rejected_request_fails_without_retrying(stand_in, row, sender_for, status):
+    server = stand_in(error_rate=1.0, error_status=status)
+    sender = sender_for(server)
+
+    sender._deliver(row.claim())
+
+    assert (row.status, row.attempts) == ("failed", 1)
+    assert server.stats.requests == 1
+    assert sender.client.breaker.state == "closed"
+
+
+def test_rate_limited_request_is_retried(stand_in, row, sender_for):
+    server = stand_in(error_rate=1.0, error_status=429)
+    sender = sender_for(server)
+
+    sender._deliver(row.claim())
+
+    assert (row.status, row.retry_in_s) == ("pending", retry_delay_s(1))
+
+
+def test_successful_delivery_is_marked_sent(stand_in, row, sender_for):
+    server = stand_in()
+    sender = sender_for(server)
+
+    sender._deliver(row.claim())
+
+    assert row.status == "sent"
+    assert server.stats.idempotency_keys == {"outbox-test"}
@@ -0,0 +1,283 @@
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.audit_rules import RULE_STEPS, clean_leads_mask, evaluate_audit_rules, evaluate_lead_rules
+from services.vtal_churn_service import analyze_churn_history, prepare_vtal_history
+
+
+TODAY = date(2026, 10, 17)
+
+
+# Per-renderer checks the rules module replaced (ui/sections/analysis.py and
+# address_helpers.py before it), on leads they could render without crashing.
+def _old_serpro(lead):
+    if lead["statusregistration"] is None:
+        return None
+    return "reprovado" if lead["statusregistration"] != "REGULAR" else "aprovado"
+
+
+def _old_serasa(lead):
+    if lead["statusregistration"] is None or lead["statusregistration"] != "REGULAR":
+        return None
+
+    valor_total = lead["serasa_json"]["negativeData"]["pefin"]["summary"]["balance"]
+    score_serasa = int(lead["credit_score"]) if not pd.isna(lead["credit_score"]) else "—"
+
+    if valor_total > 100:
+        return "reprovado"
+    if score_serasa != "—" and score_serasa >= 450:
+        return "aprovado"
+    return None
+
+
+def _old_court_case(lead):
+    n_processos_reu = lead["active_cases_as_defendant"] if not pd.isna(lead["active_cases_as_defendant"]) else 0
+    n_processos_criminais = (
+        len(lead["active_criminal_cases"]) if lead["active_criminal_cases"] is not None else 0
+    )
+
+    if n_processos_criminais == 0:
+        return "aprovado" if n_processos_reu <= 4 else None
+    return "reprovado"
+
+
+def _old_corp_doc(lead):
+    if lead["cnpj"] is None:
+        return None
+    if lead["doc_situation"] is None:
+        return "reprovado"
+
+    cnpj_result = lead["cnpj_json"]
+    time_since_opening = (
+        TODAY - datetime.strptime(cnpj_result["data_inicio_atividade"], "%Y-%m-%d").date()
+    ).days
+    if time_since_opening < 90 or cnpj_result["descricao_situacao_cadastral"] != "ATIVA":
+        return "reprovado"
+    return None
+
+
+def _old_address_info(lead):
+    return "reprovado" if lead["vtal_availability"]["resource"]["availabilityCode"] == 2 else None
+
+
+OLD_RULES = {
+    "serpro": _old_serpro,
+    "serasa": _old_serasa,
+    "court_case": _old_court_case,
+    "corp_doc": _old_corp_doc,
+    "address_info": _old_address_info,
+}
+
+
+def _lead(**overrides):
+    lead = {
+        "statusregistration": "REGULAR",
+        "credit_score": 700,
+        "serasa_json": {"negativeData": {"pefin": {"summary": {"balance": 0}}}},
+        "active_cases_as_defendant": 0,
+        "active_criminal_cases": [],
+        "cnpj": None,
+        "doc_situation": None,
+        "cnpj_json": None,
+        "vtal_availability": {"resource": {"availabilityCode": 1}},
+    }
+    lead.update(overrides)
+    return lead
+
+
+def _random_leads(n_rows: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    leads = []
+    for _ in range(n_rows):
+        has_cnpj = rng.random() < 0.5
+        opened = TODAY - timedelta(days=int(rng.integers(80, 100)))
+        leads.append(
+            _lead(
+                statusregistration=rng.choice(np.array(["REGULAR", "SUSPENSA", None], dtype=object)),
+                credit_score=rng.choice(np.array([448, 449, 450, 451, np.nan], dtype=object)),
+                serasa_json={
+                    "negativeData": {"pefin": {"summary": {"balance": float(rng.choice([0, 99.99, 100, 100.01, 500]))}}}
+                },
+                active_cases_as_defendant=rng.choice(np.array([0, 3, 4, 5, np.nan], dtype=object)),
+                active_criminal_cases=rng.choice(np.array([None, 0, 1], dtype=object)),
+                cnpj="12345678000199" if has_cnpj else None,
+                doc_situation=rng.choice(np.array(["ATIVA", None], dtype=object)) if has_cnpj else None,
+                cnpj_json={
+                    "descricao_situacao_cadastral": rng.choice(["ATIVA", "BAIXADA"]),
+                    "data_inicio_atividade": opened.isoformat(),
+                } if has_cnpj else None,
+                vtal_availability={"resource": {"availabilityCode": int(rng.choice([1, 2, 3]))}},
+            )
+        )
+    for lead in leads:
+        cases = lead["active_criminal_cases"]
+        lead["active_criminal_cases"] = None if cases is None else [{"numero": "0000"}] * cases
+    return pd.DataFrame(leads)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_vectorized_rules_match_the_renderer_checks(seed):
+    df = _random_leads(300, seed)
+
+    decisions = evaluate_audit_rules(df, today=TODAY)
+
+    assert list(decisions.columns) == list(RULE_STEPS)
+    for step, old_rule in OLD_RULES.items():
+        expected = [old_rule(lead) for lead in df.to_dict("records")]
+        assert decisions[step].tolist() == expected, step
+
+
+@pytest.mark.parametrize(
+    ("balance", "score", "expected"),
+    [
+        (100, 450, "aprovado"),
+        (100.01, 450, "reprovado"),
+        (100.01, np.nan, "reprovado"),
+        (0, 449, None),
+        (0, np.nan, None),
+    ],
+)
+def test_serasa_debt_and_score_cutoffs(balance, score, expected):
+    lead = _lead(
+        serasa_json={"negativeData": {"pefin": {"summary": {"balance": balance}}}},
+        credit_score=score,
+    )
+    assert evaluate_lead_rules(lead, today=TODAY)["serasa"] == expected
+
+
+@pytest.mark.parametrize(
+    ("status", "serpro", "serasa"),
+    [("REGULAR", "aprovado", "aprovado"), ("SUSPENSA", "reprovado", None), (None, None, None), (np.nan, None, None)],
+)
+def test_cpf_status(status, serpro, serasa):
+    decisions = evaluate_lead_rules(_lead(statusregistration=status), today=TODAY)
+    assert (decisions["serpro"], decisions["serasa"]) == (serpro, serasa)
+
+
+def test_missing_serasa_json_does_not_reject():
+    assert evaluate_lead_rules(_lead(serasa_json=None), today=TODAY)["serasa"] == "aprovado"
+
+
+@pytest.mark.parametrize(
+    ("active_cases", "criminal_cases", "expected"),
+    [
+        (4, [], "aprovado"),
+        (5, [], None),
+        (np.nan, None, "aprovado"),
+        (0, [{"numero": "1"}], "reprovado"),
+    ],
+)
+def test_court_case_cutoffs(active_cases, criminal_cases, expected):
+    lead = _lead(active_cases_as_defendant=active_cases, active_criminal_cases=criminal_cases)
+    assert evaluate_lead_rules(lead, today=TODAY)["court_case"] == expected
+
+
+@pytest.mark.parametrize(
+    ("age_days", "situation", "doc_situation", "expected"),
+    [
+        (90, "ATIVA", "ATIVA", None),
+        (89, "ATIVA", "ATIVA", "reprovado"),
+        (400, "BAIXADA", "ATIVA", "reprovado"),
+        (400, "ATIVA", None, "reprovado"),
+    ],
+)
+def test_cnpj_age_and_situation(age_days, situation, doc_situation, expected):
+    lead = _lead(
+        cnpj="12345678000199",
+        doc_situation=doc_situation,
+        cnpj_json={
+            "descricao_situacao_cadastral": situation,
+            "data_inicio_atividade": (TODAY - timedelta(days=age_days)).isoformat(),
+        },
+    )
+    assert evaluate_lead_rules(lead, today=TODAY)["corp_doc"] == expected
+
+
+def test_leads_without_cnpj_or_availability_get_no_decision():
+    decisions = evaluate_lead_rules(_lead(vtal_availability=None), today=TODAY)
+    assert decisions["corp_doc"] is None
+    assert decisions["address_info"] is None
+
+
+def test_clean_leads_mask():
+    df = pd.DataFrame(
+        [
+            _lead(hzn_serasa_result=None, hzn_final_result=None),
+            _lead(hzn_serasa_result="reprovado", hzn_final_result=None),
+            _lead(credit_score=449, hzn_serasa_result=None, hzn_final_result=None),
+            _lead(vtal_availability={"resource": {"availabilityCode": 2}}, hzn_serasa_result=None, hzn_final_result=None),
+        ]
+    )
+    assert clean_leads_mask(df, today=TODAY).tolist() == [True, False, False, False]
+
+
+# V.Tal churn verdicts vs the former inline checks of build_vtal_analysis.
+def _old_churn_verdicts(add_df, today):
+    max_date = pd.Timestamp(today) - pd.DateOffset(months=24)
+    verdicts = {"active_client": len(add_df[add_df["Status - V.Tal"] == "hc_ativo"]) > 0}
+
+    for kind, limit, key in (("voluntario", 3, "vol_churn_3m"), ("involuntario", 6, "invol_churn_6m")):
+        history = add_df[
+            (add_df["Tipo Churn"] == kind) & (pd.to_datetime(add_df["Data - Retirada"]) >= max_date)
+        ]
+        months = history["Mês Churn"].str.replace("M", "").astype(int)
+        verdicts[key] = len(history[months <= limit]) > 0
+
+    return verdicts
+
+
+def _random_history(n_rows: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    cutoff = pd.Timestamp(TODAY) - pd.DateOffset(months=24)
+    retirada = cutoff + pd.to_timedelta(rng.integers(-3, 3, n_rows), unit="D")
+    return pd.DataFrame(
+        {
+            "Status - V.Tal": rng.choice(["hc_ativo", "hc_inativo", "hc_inativo"], n_rows),
+            "Tipo Churn": rng.choice(["voluntario", "involuntario", None], n_rows),
+            "Data - Retirada": retirada.strftime("%Y-%m-%d"),
+            "Mês Churn": [f"M{m}" for m in rng.integers(1, 9, n_rows)],
+        }
+    )
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_churn_verdicts_match_the_renderer_checks(seed):
+    history = _random_history(int(np.random.default_rng(seed).integers(1, 7)), seed)
+    expected = _old_churn_verdicts(history.copy(), TODAY)
+
+    analysis = analyze_churn_history(prepare_vtal_history(history.copy()), today=TODAY)
+
+    assert {
+        "active_client": analysis.active_client,
+        "vol_churn_3m": analysis.vol_churn_3m,
+        "invol_churn_6m": analysis.invol_churn_6m,
+    } == expected
+
+
+@pytest.mark.parametrize(
+    ("kind", "month", "days_after_cutoff", "vol", "invol"),
+    [
+        ("voluntario", "M3", 0, True, False),
+        ("voluntario", "M4", 0, False, False),
+        ("voluntario", "M3", -1, False, False),
+        ("involuntario", "M6", 0, False, True),
+        ("involuntario", "M7", 0, False, False),
+    ],
+)
+def test_churn_month_limits_and_window(kind, month, days_after_cutoff, vol, invol):
+    cutoff = pd.Timestamp(TODAY) - pd.DateOffset(months=24)
+    history = pd.DataFrame(
+        {
+            "Status - V.Tal": ["hc_inativo"],
+            "Tipo Churn": [kind],
+            "Data - Retirada": [(cutoff + pd.Timedelta(days=days_after_cutoff)).strftime("%Y-%m-%d")],
+            "Mês Churn": [month],
+        }
+    )
+
+    analysis = analyze_churn_history(prepare_vtal_history(history), today=TODAY)
+
+    assert (analysis.vol_churn_3m, analysis.invol_churn_6m) == (vol, invol)
@@ -0,0 +1,54 @@
+from datetime import date
+
+import pandas as pd
+
+from db.repos import lead_repo
+from services.audit_services import BULK_AUDIT_COLUMNS, find_clean_auditable_leads
+
+
+def _auditable_lead(lead_id, **overrides):
+    lead = {
+        "lead_id": lead_id,
+        "lead_dt": date(2026, 10, 1),
+        "name": f"Lead {lead_id}",
+        "cpf": "12345678900",
+        "cnpj": None,
+        "addsales_code": f"A{lead_id}",
+        "statusregistration": "REGULAR",
+        "credit_score": 700,
+        "serasa_json": {"negativeData": {"pefin": {"summary": {"balance": 0}}}},
+        "active_cases_as_defendant": 0,
+        "active_criminal_cases": [],
+        "doc_situation": None,
+        "cnpj_json": None,
+        "vtal_availability": {"resource": {"availabilityCode": 1}},
+        "hzn_serasa_result": None,
+        "hzn_biometrics_result": None,
+    }
+    lead.update(overrides)
+    return lead
+
+
+def test_clean_candidates_keep_only_the_bulk_audit_columns(monkeypatch):
+    leads = pd.DataFrame(
+        [
+            _auditable_lead("1"),
+            _auditable_lead("2", credit_score=100),
+            _auditable_lead("3", hzn_biometrics_result="reprovado"),
+        ]
+    )
+    monkeypatch.setattr(lead_repo, "fetch_auditable_leads", lambda engine, d_start, d_end: leads)
+
+    candidates = find_clean_auditable_leads(None, d_start=date(2026, 10, 1), d_end=date(2026, 10, 31))
+
+    assert list(candidates.columns) == BULK_AUDIT_COLUMNS
+    assert candidates["lead_id"].tolist() == ["1"]
+
+
+def test_no_candidates_still_has_the_bulk_audit_columns(monkeypatch):
+    monkeypatch.setattr(lead_repo, "fetch_auditable_leads", lambda engine, d_start, d_end: pd.DataFrame())
+
+    candidates = find_clean_auditable_leads(None, d_start=date(2026, 10, 1), d_end=date(2026, 10, 31))
+
+    assert candidates.empty
+    assert list(candidates.columns) == BULK_AUDIT_COLUMNS
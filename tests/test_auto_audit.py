@@ -0,0 +1,126 @@
+from datetime import date, timedelta
+
+import pandas as pd
+import pytest
+
+from auto_audit import date_chunks
+from db.repos import lead_repo
+from services.audit_services import auto_audit_leads
+
+
+def test_date_chunks_single_day():
+    day = date(2026, 3, 10)
+    assert date_chunks(day, day, 7) == [(day, day)]
+
+
+def test_date_chunks_uneven_range():
+    chunks = date_chunks(date(2026, 1, 1), date(2026, 1, 10), 4)
+    assert chunks == [
+        (date(2026, 1, 1), date(2026, 1, 4)),
+        (date(2026, 1, 5), date(2026, 1, 8)),
+        (date(2026, 1, 9), date(2026, 1, 10)),
+    ]
+
+
+@pytest.mark.parametrize("chunk_days", [1, 3, 7, 30, 400])
+def test_date_chunks_cover_the_range_inclusively(chunk_days):
+    d_start, d_end = date(2025, 12, 20), date(2026, 2, 14)
+
+    chunks = date_chunks(d_start, d_end, chunk_days)
+
+    assert chunks[0][0] == d_start
+    assert chunks[-1][1] == d_end
+    for (_, end), (next_start, _) in zip(chunks, chunks[1:]):
+        assert next_start == end + timedelta(days=1)
+    assert all(0 <= (end - start).days < chunk_days for start, end in chunks)
+
+
+def test_date_chunks_rejects_empty_chunks():
+    with pytest.raises(ValueError):
+        date_chunks(date(2026, 1, 1), date(2026, 1, 2), 0)
+
+
+def _audited_lead(lead_id, **overrides):
+    lead = {
+        "lead_id": lead_id,
+        "statusregistration": "REGULAR",
+        "credit_score": 700,
+        "serasa_json": {"negativeData": {"pefin": {"summary": {"balance": 0}}}},
+        "active_cases_as_defendant": 0,
+        "active_criminal_cases": [],
+        "cnpj": None,
+        "doc_situation": None,
+        "cnpj_json": None,
+        "vtal_availability": {"resource": {"availabilityCode": 1}},
+        "hzn_serpro_result": None,
+        "hzn_serasa_result": None,
+        "hzn_court_case_result": None,
+        "hzn_corp_doc_result": None,
+        "hzn_address_info_result": None,
+    }
+    lead.update(overrides)
+    return lead
+
+
+def test_auto_audit_sends_only_changed_decisions(monkeypatch):
+    leads = pd.DataFrame(
+        [
+            # Every rule already stored: nothing to send.
+            _audited_lead(
+                "unchanged",
+                hzn_serpro_result="aprovado",
+                hzn_serasa_result="aprovado",
+                hzn_court_case_result="aprovado",
+            ),
+            # Stored serasa approval is now a rejection; the other steps match.
+            _audited_lead(
+                "serasa_changed",
+                serasa_json={"negativeData": {"pefin": {"summary": {"balance": 500}}}},
+                hzn_serpro_result="aprovado",
+                hzn_serasa_result="aprovado",
+                hzn_court_case_result="aprovado",
+            ),
+            # Never audited.
+            _audited_lead("new"),
+        ]
+    )
+    calls = {}
+
+    def fake_update(engine, *, field_suffix, decisions, batch_size):
+        calls[field_suffix] = decisions
+        return len(decisions)
+
+    monkeypatch.setattr(lead_repo, "fetch_leads", lambda engine, d_start, d_end: leads)
+    monkeypatch.setattr(lead_repo, "update_audit_step_bulk", fake_update)
+
+    stats = auto_audit_leads(None, d_start=date(2026, 1, 1), d_end=date(2026, 1, 31))
+
+    assert calls == {
+        "serpro": {"new": "aprovado"},
+        "serasa": {"serasa_changed": "reprovado", "new": "aprovado"},
+        "court_case": {"new": "aprovado"},
+    }
+    assert stats == {"leads": 3, "decisions": 4, "updated": 4}
+
+
+def test_auto_audit_skips_the_write_when_nothing_changed(monkeypatch):
+    leads = pd.DataFrame(
+        [
+            _audited_lead(
+                "unchanged",
+                hzn_serpro_result="aprovado",
+                hzn_serasa_result="aprovado",
+                hzn_court_case_result="aprovado",
+            )
+        ]
+    )
+
+    def fail_update(*args, **kwargs):
+        raise AssertionError("no decision changed")
+
+    monkeypatch.setattr(lead_repo, "fetch_leads", lambda engine, d_start, d_end: leads)
+    monkeypatch.setattr(lead_repo, "update_audit_step_bulk", fail_update)
+
+    stats = auto_audit_leads(None, d_start=date(2026, 1, 1), d_end=date(2026, 1, 31))
+
+    assert stats == {"leads": 1, "decisions": 0, "updated": 0}
@@ -0,0 +1,145 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import core.cache
+from core.cache import LRUTTLCache
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(core.cache, "time", SimpleNamespace(monotonic=clock))
+    return clock
+
+
+def test_evicts_least_recently_used():
+    cache = LRUTTLCache(maxsize=2, ttl_seconds=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "b" is now the least recently used
+
+    cache.put("c", 3)
+
+    assert cache.missing(["a", "b", "c"]) == ["b"]
+    assert len(cache) == 2
+
+
+def test_put_refreshes_recency():
+    cache = LRUTTLCache(maxsize=2, ttl_seconds=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.put("a", 10)
+
+    cache.put("c", 3)
+
+    assert cache.get("a") == 10
+    assert cache.get("b") is None
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = LRUTTLCache(maxsize=10, ttl_seconds=30)
+    cache.put("a", 1)
+
+    clock.now += 30
+    assert cache.get("a") == 1
+
+    clock.now += 0.001
+    assert cache.get("a", "expired") == "expired"
+    assert len(cache) == 0
+    assert cache.stats() == {"size": 0, "maxsize": 10, "hits": 1, "misses": 1}
+
+
+def test_expired_entry_is_reloaded(clock):
+    cache = LRUTTLCache(maxsize=10, ttl_seconds=30)
+    loads = []
+
+    def loader():
+        loads.append(clock.now)
+        return len(loads)
+
+    assert cache.get_or_load("a", loader) == 1
+    assert cache.get_or_load("a", loader) == 1
+    clock.now += 31
+    assert cache.get_or_load("a", loader) == 2
+
+
+def _run_concurrently(cache, key, loader, n_threads):
+    results, errors = [], []
+
+    def worker():
+        try:
+            results.append(cache.get_or_load(key, loader))
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=worker) for _ in range(n_threads)]
+    for thread in threads:
+        thread.start()
+    return threads, results, errors
+
+
+def _wait_for_misses(cache, n_misses):
+    deadline = time.monotonic() + 5
+    while cache.misses < n_misses:
+        assert time.monotonic() < deadline, "threads never reached the cache"
+        time.sleep(0.001)
+
+
+def test_get_or_load_is_single_flight():
+    cache = LRUTTLCache(maxsize=10, ttl_seconds=60)
+    release = threading.Event()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        release.wait(5)
+        return "value"
+
+    threads, results, errors = _run_concurrently(cache, "key", loader, n_threads=16)
+    _wait_for_misses(cache, 16)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert results == ["value"] * 16
+    assert errors == []
+    assert cache.get("key") == "value"
+
+
+def test_loader_error_does_not_poison_the_key():
+    cache = LRUTTLCache(maxsize=10, ttl_seconds=60)
+    release = threading.Event()
+
+    def failing_loader():
+        release.wait(5)
+        raise RuntimeError("db down")
+
+    threads, results, errors = _run_concurrently(cache, "key", failing_loader, n_threads=4)
+    _wait_for_misses(cache, 4)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert results == []
+    assert len(errors) == 4 and all(str(exc) == "db down" for exc in errors)
+    assert cache.missing(["key"]) == ["key"]
+
+    assert cache.get_or_load("key", lambda: "recovered") == "recovered"
+    assert cache.get("key") == "recovered"
+
+
+def test_rejects_empty_cache():
+    with pytest.raises(ValueError):
+        LRUTTLCache(maxsize=0, ttl_seconds=60)
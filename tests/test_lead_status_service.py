@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.lead_status_service import LEAD_STATUSES, define_lead_status, define_lead_status_frame
+
+
+def _random_leads(n_rows: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    audit_values = np.array([True, False, None, np.nan], dtype=object)
+    result_values = np.array(["aprovado", "pendente", "reprovado", None, np.nan], dtype=object)
+    homeativo_values = np.array(["Venda aprovada", "Reprovado", "Em negociação", None], dtype=object)
+
+    return pd.DataFrame(
+        {
+            "hzn_audit": rng.choice(audit_values, n_rows),
+            "hzn_final_result": rng.choice(result_values, n_rows),
+            "homeativo_status": rng.choice(homeativo_values, n_rows),
+        }
+    )
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_frame_matches_row_wise_status(seed):
+    df = _random_leads(500, seed)
+
+    expected = df.apply(define_lead_status, axis=1)
+    result = define_lead_status_frame(df)
+
+    pd.testing.assert_series_equal(result, expected, check_dtype=False)
+    assert set(result) <= set(LEAD_STATUSES)
+
+
+def test_frame_matches_row_wise_status_on_bool_and_float_columns():
+    df = pd.DataFrame(
+        {
+            "hzn_audit": [True, False, True, np.nan],
+            "hzn_final_result": [np.nan, np.nan, "aprovado", "reprovado"],
+            "homeativo_status": ["Reprovado", "Venda aprovada", None, "Venda aprovada"],
+        }
+    )
+
+    expected = df.apply(define_lead_status, axis=1)
+
+    pd.testing.assert_series_equal(define_lead_status_frame(df), expected, check_dtype=False)
+    assert expected.tolist() == ["Necessária auditoria", "Aprovado", "Aprovado - Auditoria", "Aprovado"]
@@ -1,16 +1,66 @@
 from __future__ import annotations
 
-from typing import Callable, Optional
+from typing import Callable, Hashable, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 import streamlit as st
 
+from core.state import get_lead_record, get_snapshot_cache
+from core.timing import timed
+from services.lead_search_index import NGramIndex
+from services.lead_snapshot_service import SEARCH_KEY_COLUMNS, fold_text
+from services.lead_status_service import LEAD_STATUSES
+
 
 def _normalize_digits(value: str) -> str:
     return "".join(char for char in str(value) if char.isdigit())
 
 
+def _get_search_index(df: pd.DataFrame, column: str) -> NGramIndex:
+    """
+    N-gram index of one search key column, rebuilt when the snapshot object changes.
+    """
+    indexes = get_snapshot_cache(df).setdefault("search_indexes", {})
+    if column not in indexes:
+        indexes[column] = NGramIndex(df[column])
+    return indexes[column]
+
+
+def _search_positions(df: pd.DataFrame, column: str, query: str) -> np.ndarray:
+    """
+    Positions of the snapshot rows whose `column` contains `query`.
+    While the user keeps typing (the new query contains the previous one on the
+    same column), only the previous matches are re-checked.
+    """
+    previous = st.session_state.get("_leads_last_search")
+
+    if (
+        previous is not None
+        and previous["frame"] is df
+        and previous["column"] == column
+        and previous["query"] in query
+    ):
+        positions = previous["positions"]
+        if previous["query"] != query:
+            matches = df[column].iloc[positions].str.contains(query, regex=False).to_numpy()
+            positions = positions[matches]
+    else:
+        positions = _get_search_index(df, column).search(query)
+
+    st.session_state["_leads_last_search"] = {
+        "frame": df,
+        "column": column,
+        "query": query,
+        "positions": positions,
+    }
+    return positions
+
+
 def _apply_leads_filter(df: pd.DataFrame, filter_type: str, filter_value: str) -> pd.DataFrame:
+    """
+    Filter the snapshot on its normalized keys (add_search_keys) via n-gram indexes.
+    """
     if filter_type == "Nenhum":
         return df
 
@@ -18,38 +68,23 @@ def _apply_leads_filter(df: pd.DataFrame, filter_type: str, filter_value: str) -
     if not cleaned_value:
         return df
 
+    if not set(SEARCH_KEY_COLUMNS).issubset(df.columns):
+        st.warning("Filtro indisponível (chaves de busca ausentes).")
+        return df
+
     if filter_type == "Nome":
-        if "name" not in df.columns:
-            st.warning("Filtro por nome indisponível (coluna ausente).")
-            return df
-        return df[df["name"].astype(str).str.lower().str.contains(cleaned_value, case=False, na=False)]
-
-    if filter_type == "CPF":
-        if "cpf" not in df.columns:
-            st.warning("Filtro por CPF indisponível (coluna ausente).")
-            return df
-        digits = _normalize_digits(cleaned_value)
-        if not digits:
-            return df
-        cpf_series = df["cpf"].astype(str).str.replace(r"\D", "", regex=True)
-        return df[cpf_series.str.contains(digits, na=False)]
-
-    if filter_type == "CEP":        
-        digits = _normalize_digits(cleaned_value)
-        
-        if not digits:
-            return df
-        
-        cep_series = df["vtal_address"].apply(
-            lambda x: x['address']['zipCode'] \
-            if (x is not None) and ('address' in x) else ""
-        )
-        cep_series = cep_series.astype(str).str.replace(r"\D", "", regex=True)
-        
+        column, query = "search_name", fold_text(cleaned_value)
+    elif filter_type == "CPF":
+        column, query = "search_cpf", _normalize_digits(cleaned_value)
+    elif filter_type == "CEP":
+        column, query = "search_cep", _normalize_digits(cleaned_value)
+    else:
+        return df
 
-        return df[cep_series.str.contains(digits, na=False)]
+    if not query:
+        return df
 
-    return df
+    return df.iloc[_search_positions(df, column, query)]
 
 
 def status_badge(text: str) -> str:
@@ -94,13 +129,73 @@ def render_lead_card(row: pd.Series, selected: bool) -> None:
 
 
 def manage_lead_selection_visuals(df: pd.DataFrame) -> None:
-    selected_id = st.session_state.get("selected_lead_id")
-    for _, row in df.iterrows():
-        is_selected = str(row["lead_id"]) == str(selected_id)
-        render_lead_card(row, is_selected)
+    selected_id = str(st.session_state.get("selected_lead_id"))
+    for row_id, (_, row) in zip(df["lead_id"].astype(str), df.iterrows()):
+        render_lead_card(row, row_id == selected_id)
+
+
+def _fetch_leads_page(
+    fetch_page: Callable[..., Tuple[pd.DataFrame, int]],
+    *,
+    status: str,
+    items_per_page: int,
+    query_key: Hashable,
+) -> Tuple[pd.DataFrame, int]:
+    """
+    Server-side page of the lead list, addressed by keyset cursors remembered per
+    page for the current query (OFFSET only when jumping to an unvisited page).
+    `query_key` identifies the date range and leads version behind `fetch_page`:
+    cursors of another range/version would address wrong pages.
+    """
+    filter_type = st.session_state.get("leads_filter_type", "Nenhum")
+    filter_value = str(st.session_state.get("leads_filter_value", "") or "").strip()
+
+    filters = {"status": None if status == "Todos" else status}
+    if filter_value and filter_type == "Nome":
+        filters["name"] = fold_text(filter_value)
+    elif filter_value and filter_type == "CPF":
+        filters["cpf"] = _normalize_digits(filter_value) or None
+    elif filter_value and filter_type == "CEP":
+        filters["cep"] = _normalize_digits(filter_value) or None
+
+    cursor_key = (query_key, tuple(sorted(filters.items())), items_per_page)
+    if st.session_state.get("_leads_cursor_key") != cursor_key:
+        st.session_state["_leads_cursor_key"] = cursor_key
+        st.session_state["_leads_page_cursors"] = {}
+    cursors = st.session_state["_leads_page_cursors"]
+
+    def fetch(page: int) -> Tuple[pd.DataFrame, int]:
+        cursor = cursors.get(page)
+        page_df, total_items = fetch_page(
+            **filters,
+            cursor=cursor,
+            offset=0 if cursor is not None else (page - 1) * items_per_page,
+            page_size=items_per_page,
+        )
+        if len(page_df) > 0:
+            last = page_df.iloc[-1]
+            cursors[page + 1] = (last["lead_dt"], last["lead_id"])
+        return page_df, total_items
 
+    page_df, total_items = fetch(st.session_state["leads_page"])
 
-def build_lead_overall_display(df: pd.DataFrame, *, items_per_page: int) -> None:
+    total_pages = max((total_items - 1) // items_per_page + 1, 1)
+    if st.session_state["leads_page"] > total_pages:
+        st.session_state["leads_page"] = total_pages
+        page_df, total_items = fetch(total_pages)
+
+    return page_df, total_items
+
+
+@timed()
+def build_lead_overall_display(
+    df: Optional[pd.DataFrame],
+    *,
+    items_per_page: int,
+    fetch_page: Optional[Callable[..., Tuple[pd.DataFrame, int]]] = None,
+    prefetch_page: Optional[Callable[[pd.DataFrame], None]] = None,
+    page_query_key: Hashable = None,
+) -> None:
     st.subheader("Leads por Status")
 
     prev_filter_type = st.session_state.get("leads_filter_type", "Nenhum")
@@ -127,7 +222,10 @@ def build_lead_overall_display(df: pd.DataFrame, *, items_per_page: int) -> None
             disabled=selected_filter_type == "Nenhum",
         )
 
-    all_statuses = sorted(df["status"].dropna().unique().tolist())
+    if fetch_page is None:
+        all_statuses = sorted(df["status"].dropna().unique().tolist())
+    else:
+        all_statuses = LEAD_STATUSES
     status_options = ["Todos"] + all_statuses
 
     prev_selected = st.session_state.get("leads_selected_status", "Todos")
@@ -150,22 +248,35 @@ def build_lead_overall_display(df: pd.DataFrame, *, items_per_page: int) -> None
         st.session_state["leads_filter_value"] = selected_filter_value
         st.session_state["leads_page"] = 1
 
-    if selected_status == "Todos":
-        df_filtered = df.copy()
-    else:
-        df_filtered = df[df["status"] == selected_status].copy()
+    st.session_state.setdefault("leads_page", 1)
+    st.session_state["leads_page"] = max(1, st.session_state["leads_page"])
+
+    if fetch_page is None:
+        # Text filter first: the search indexes are built over the whole snapshot.
+        df_filtered = _apply_leads_filter(
+            df,
+            st.session_state.get("leads_filter_type", "Nenhum"),
+            st.session_state.get("leads_filter_value", ""),
+        )
 
-    df_filtered = _apply_leads_filter(
-        df_filtered,
-        st.session_state.get("leads_filter_type", "Nenhum"),
-        st.session_state.get("leads_filter_value", ""),
-    )
+        if selected_status != "Todos":
+            df_filtered = df_filtered[df_filtered["status"] == selected_status]
 
-    total_items = len(df_filtered)
-    total_pages = max((total_items - 1) // items_per_page + 1, 1)
+        total_items = len(df_filtered)
+        total_pages = max((total_items - 1) // items_per_page + 1, 1)
+        st.session_state["leads_page"] = min(st.session_state["leads_page"], total_pages)
 
-    st.session_state.setdefault("leads_page", 1)
-    st.session_state["leads_page"] = min(max(1, st.session_state["leads_page"]), total_pages)
+        start = (st.session_state["leads_page"] - 1) * items_per_page
+        end = start + items_per_page
+        page_df = df_filtered.iloc[start:end]
+    else:
+        page_df, total_items = _fetch_leads_page(
+            fetch_page,
+            status=selected_status,
+            items_per_page=items_per_page,
+            query_key=page_query_key,
+        )
+        total_pages = max((total_items - 1) // items_per_page + 1, 1)
 
     top_left, top_mid, top_right = st.columns([1, 2, 1])
     with top_left:
@@ -192,12 +303,11 @@ def build_lead_overall_display(df: pd.DataFrame, *, items_per_page: int) -> None
         st.session_state["leads_page"] += 1
         st.rerun()
 
-    start = (st.session_state["leads_page"] - 1) * items_per_page
-    end = start + items_per_page
-    page_df = df_filtered.iloc[start:end]
-
     manage_lead_selection_visuals(page_df)
 
+    if prefetch_page is not None:
+        prefetch_page(page_df)
+
     b_left, b_mid, b_right = st.columns([1, 2, 1])
     with b_left:
         prev_btn2 = st.button(
@@ -235,8 +345,10 @@ def build_lead_overall_display(df: pd.DataFrame, *, items_per_page: int) -> None
 
 
 def build_detailed_lead_display(
-    df: pd.DataFrame,
+    df: Optional[pd.DataFrame],
     *,
+    load_row: Optional[Callable[[str], Optional[dict]]] = None,
+    load_detail: Optional[Callable[[dict], dict]] = None,
     render_general: Callable[[dict], None],
     render_first_analysis: Callable[[dict], None],
     render_detailed_analysis: Callable[[dict], None],
@@ -251,7 +363,16 @@ def build_detailed_lead_display(
             st.info("Selecione um lead na lista ao lado para ver os detalhes.")
             return
 
-        lead_data = df.loc[df["lead_id"] == selected_id].iloc[0].to_dict()
+        lead_data = get_lead_record(df, selected_id) if df is not None else None
+        if lead_data is None and load_row is not None:
+            lead_data = load_row(selected_id)
+
+        if lead_data is None:
+            st.info("Selecione um lead na lista ao lado para ver os detalhes.")
+            return
+
+        if load_detail is not None:
+            lead_data = load_detail(lead_data)
 
         render_general(lead_data)
         render_first_analysis(lead_data)
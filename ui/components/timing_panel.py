@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import pandas as pd
+import streamlit as st
+
+from core.timing import SLOW_RERUN_S, TimingRegistry, process_registry, session_registry
+
+
+HOTTEST_SECTIONS = 10
+
+TIMING_COLUMNS = {
+    "span": "Seção",
+    "count": "Execuções",
+    "total_ms": "Total (ms)",
+    "p50_ms": "p50 (ms)",
+    "p95_ms": "p95 (ms)",
+    "max_ms": "Máx (ms)",
+}
+
+SLOW_RERUN_COLUMNS = {
+    "at": "Quando",
+    "user": "Usuário",
+    "total_ms": "Total (ms)",
+    "slowest": "Seções mais lentas",
+}
+
+
+def _timing_table(registry: TimingRegistry) -> None:
+    rows = registry.summary()[:HOTTEST_SECTIONS]
+    if not rows:
+        st.caption("Sem medições ainda.")
+        return
+
+    df = pd.DataFrame(rows).rename(columns=TIMING_COLUMNS)
+    st.dataframe(df.round(1), hide_index=True, use_container_width=True)
+
+
+def build_timing_panel() -> None:
+    """
+    Admin sidebar panel: hottest sections (session and process) and recent slow reruns.
+    """
+    with st.expander("⏱️ Desempenho"):
+        scope = st.radio("Escopo", ["Sessão", "Processo"], horizontal=True, key="timing_scope")
+        registry = session_registry() if scope == "Sessão" else process_registry()
+
+        st.caption("Seções mais custosas (tempo total)")
+        _timing_table(registry)
+
+        st.caption(f"Reruns acima de {SLOW_RERUN_S:.1f} s")
+        if registry.slow_reruns:
+            df = pd.DataFrame(list(registry.slow_reruns)).rename(columns=SLOW_RERUN_COLUMNS)
+            st.dataframe(df.round(0), hide_index=True, use_container_width=True)
+        else:
+            st.caption("Nenhum rerun lento.")
+
+        if st.button("Zerar medições", use_container_width=True, key="timing_clear"):
+            registry.clear()
+            st.rerun()
@@ -68,27 +68,59 @@ def fmt_zipcode(z) -> str:
     return f"{z[:2]}.{z[2:5]}-{z[5:]}"
 
 
+def fmt_cpf_series(s: pd.Series) -> pd.Series:
+    """
+    Vectorized fmt_cpf.
+    """
+    fmt_s = s.astype(str).str.strip().str.replace(".", "", regex=False).str.replace("-", "", regex=False)
+    formatted = fmt_s.str[:3] + "." + fmt_s.str[3:6] + "." + fmt_s.str[6:9] + "-" + fmt_s.str[9:11]
+
+    return formatted.where(fmt_s.str.len() == 11, fmt_s)
+
+
 def fmt_leads_features(df: pd.DataFrame) -> pd.DataFrame:
     """
     Preenche campos do lead a partir do serasa_json quando estiverem faltando.
+    Altera `df` no lugar (sem cópia do frame) e o retorna.
     """
-    fmt_df = df.copy()
-
-    for i, row in fmt_df.iterrows():
-        if not pd.isna(row.get("name")):
-            continue
-
-        cpf = row.get("cpf")
-        serasa = row.get("serasa_json")
-
-        if (not pd.isna(cpf)) and (not pd.isna(serasa)) and isinstance(serasa, dict) and ("registration" in serasa):
-            reg = serasa["registration"] or {}
-            fmt_df.at[i, "name"] = reg.get("consumerName")
-            fmt_df.at[i, "mothersname"] = reg.get("motherName")
-            fmt_df.at[i, "birth_dt"] = reg.get("birthDate")
-        elif not pd.isna(cpf):
-            fmt_df.at[i, "name"] = f"CPF: {fmt_cpf(cpf)}"
-        else:
-            fmt_df.at[i, "name"] = "Documento não fornecido"
-
-    return fmt_df
\ No newline at end of file
+    def column(name: str) -> pd.Series:
+        # Absent columns count as missing values, as row.get() did in the row-wise version.
+        if name in df.columns:
+            return df[name]
+        return pd.Series(None, index=df.index, dtype=object)
+
+    missing = column("name").isna()
+    if not missing.any():
+        return df
+
+    if "serasa_json" in df.columns:
+        serasa = df.loc[missing, "serasa_json"]
+    else:
+        serasa = pd.Series(None, index=df.index[missing], dtype=object)
+
+    registrations = pd.Series(
+        [
+            (s["registration"] or {}) if isinstance(s, dict) and "registration" in s else None
+            for s in serasa
+        ],
+        index=serasa.index,
+        dtype=object,
+    )
+
+    has_cpf = column("cpf").notna()
+    with_registration = missing & has_cpf & registrations.reindex(df.index).notna()
+    cpf_only = missing & has_cpf & ~with_registration
+    no_document = missing & ~has_cpf
+
+    if with_registration.any():
+        regs = registrations[with_registration[missing]]
+        df.loc[with_registration, "name"] = [r.get("consumerName") for r in regs]
+        df.loc[with_registration, "mothersname"] = [r.get("motherName") for r in regs]
+        df.loc[with_registration, "birth_dt"] = [r.get("birthDate") for r in regs]
+
+    if cpf_only.any():
+        df.loc[cpf_only, "name"] = "CPF: " + fmt_cpf_series(df.loc[cpf_only, "cpf"])
+
+    df.loc[no_document, "name"] = "Documento não fornecido"
+
+    return df
@@ -5,8 +5,9 @@ from datetime import date
 import pandas as pd
 import streamlit as st
 
+from services.audit_rules import evaluate_lead_rules
 from ui.formatters import fmt_date, fmt_zipcode
-from ui.sections.audit_helpers import create_decision_structure, update_audit_step_features
+from ui.sections.audit_helpers import create_decision_structure, queue_audit_step_decision
 from ui.tables import build_tabela_enderecos
 
 
@@ -19,17 +20,17 @@ def build_availability_analysis(lead, *, db_engine):
 
 
     availability_analysis = availability_analysis['resource']
+    address_info_decision = evaluate_lead_rules(lead)['address_info']
 
     st.caption('Viabilidade no Endereço')
 
-    if availability_analysis['availabilityCode'] == 2:
+    if address_info_decision == 'reprovado':
         st.write(f":red[**{availability_analysis['availabilityDescription']}**]")
 
         if lead['hzn_address_info_result'] != 'reprovado':
             st.error(f"Cliente **reprovado** na consulta de viabilidade - {fmt_date(date.today())}")
-            update_audit_step_features(
-                db_engine=db_engine,
-                lead_id=lead["lead_id"],
+            queue_audit_step_decision(
+                lead=lead,
                 decision="reprovado",
                 field="address_info",
             )
@@ -5,33 +5,37 @@ from datetime import date, datetime
 import pandas as pd
 import streamlit as st
 
+from core.cache import LRUTTLCache
+from core.timing import timed_expander
 from db.engine import get_engine
 from db.repos import vtal_repo
+from services.audit_rules import evaluate_lead_rules
+from services.vtal_churn_service import analyze_churn_history, prepare_vtal_history
 from ui.formatters import fmt_cnpj, fmt_date, fmt_monetary_value, fmt_rg, fmt_cpf
 from ui.sections import address_helpers
-from ui.sections.audit_helpers import create_decision_structure, update_audit_step_features
+from ui.sections.audit_helpers import create_decision_structure, queue_audit_step_decision
 from ui.tables import build_tabela_dividas
 
 
 def build_first_analysis_info_for_lead(lead, *, db_engine) -> None:
     st.subheader("Informações Básicas")
 
-    with st.expander("Análise Cadastral"):
+    with timed_expander("Análise Cadastral"):
         build_on_register_analysis(lead, db_engine=db_engine)
 
-    with st.expander("Análise Viabilidade - V.Tal"):
+    with timed_expander("Análise Viabilidade - V.Tal"):
         address_helpers.build_availability_analysis(lead, db_engine=db_engine)
 
-    with st.expander("Comprovação de Identidade"):
+    with timed_expander("Comprovação de Identidade"):
         build_identity_analysis(lead, db_engine=db_engine)
 
-    with st.expander("Comprovação de Endereço"):
+    with timed_expander("Comprovação de Endereço"):
         address_helpers.build_address_analysis(lead, db_engine=db_engine)
 
-    with st.expander("Análise Histórico - V.Tal"):
+    with timed_expander("Análise Histórico - V.Tal"):
         build_vtal_analysis(lead, db_engine=db_engine)
 
-    with st.expander("Análise Google Street View"):
+    with timed_expander("Análise Google Street View"):
         address_helpers.build_street_view_analysis(lead, db_engine=db_engine)
 
     st.divider()
@@ -40,14 +44,14 @@ def build_first_analysis_info_for_lead(lead, *, db_engine) -> None:
 def build_detailed_analysis_info_for_lead(lead, *, db_engine) -> None:
     st.subheader("Informações Adicionais")
 
-    with st.expander("Análise Histórico Jurídico - Escavador"):
+    with timed_expander("Análise Histórico Jurídico - Escavador"):
         build_escavador_analysis(lead, db_engine=db_engine)
 
-    with st.expander("Análise Completa - Serasa"):
+    with timed_expander("Análise Completa - Serasa"):
         build_serasa_analysis(lead, db_engine=db_engine)
 
     if lead.get("cnpj") is not None:
-        with st.expander("Análise Cadastral - CNPJ"):
+        with timed_expander("Análise Cadastral - CNPJ"):
             build_cnpj_analysis(lead, db_engine=db_engine)
 
 
@@ -153,6 +157,8 @@ def build_identity_analysis(lead, *, db_engine) -> None:
 
 
 def build_cnpj_analysis(lead, *, db_engine) -> None:
+    corp_doc_decision = evaluate_lead_rules(lead)["corp_doc"]
+
     if lead["doc_situation"] is None:
         st.caption("CNPJ Cadastrado")
         st.write(lead["cnpj"])
@@ -160,9 +166,8 @@ def build_cnpj_analysis(lead, *, db_engine) -> None:
         st.error("O CNPJ cadastrado é **INVÁLIDO**!")
 
         if lead["hzn_corp_doc_result"] != "reprovado":
-            update_audit_step_features(
-                db_engine=db_engine,
-                lead_id=lead["lead_id"],
+            queue_audit_step_decision(
+                lead=lead,
                 decision="reprovado",
                 field="corp_doc",
             )
@@ -196,15 +201,14 @@ def build_cnpj_analysis(lead, *, db_engine) -> None:
     st.caption("Comprovante de situação cadastral CNPJ enviado")
     st.write(lead["doc_link_corporate"])
 
-    if time_since_opening < 90 or cnpj_result["descricao_situacao_cadastral"] != "ATIVA":
+    if corp_doc_decision == "reprovado":
         if lead["hzn_corp_doc_result"] != "reprovado":
             st.error(
                 "CNPJ Reprovado (Situação cadastral inválida ou < 90 dias) - "
                 f"{fmt_date(date.today())}"
             )
-            update_audit_step_features(
-                db_engine=db_engine,
-                lead_id=lead["lead_id"],
+            queue_audit_step_decision(
+                lead=lead,
                 decision="reprovado",
                 field="corp_doc",
             )
@@ -233,46 +237,29 @@ def build_vtal_analysis(lead, *, db_engine) -> None:
     )
 
     address = lead["vtal_address"]["address"]
-    add_df = fetch_vtal_history(address)
+    summary = fetch_vtal_churn_summary(address)
+    verdicts = {key: summary[key] for key in ("active_client", "vol_churn_3m", "invol_churn_6m")}
 
-    with st.expander("Histórico completo de HCs"):
-        st.dataframe(add_df, hide_index=True)
+    if st.toggle("Carregar histórico completo de HCs", key=f"vtal_history_{lead['lead_id']}"):
+        add_df = fetch_vtal_history(address)
 
-    active_client = len(add_df[add_df["Status - V.Tal"] == "hc_ativo"])
-    active_client = ":green[**Não**]" if active_client == 0 else ":red[**Sim**]"
+        with st.expander("Histórico completo de HCs"):
+            st.dataframe(add_df, hide_index=True)
 
-    today = pd.to_datetime("today")
-    max_date = today - pd.DateOffset(months=24)
+        churn = analyze_churn_history(add_df)
 
-    churn_vol_history = add_df[
-        (add_df["Tipo Churn"] == "voluntario")
-        & (pd.to_datetime(add_df["Data - Retirada"]) >= max_date)
-    ]
-    churn_vol_history["Mês Churn"] = churn_vol_history["Mês Churn"].str.replace("M", "").astype(int)
+        with st.expander("Histórico de Churn VOL - Últimos 24 meses"):
+            st.dataframe(churn.vol_history, hide_index=True)
 
-    with st.expander("Histórico de Churn VOL - Últimos 24 meses"):
-        st.dataframe(churn_vol_history, hide_index=True)
-
-    churn_vol_filter = (
-        ":green[**Não**]"
-        if len(churn_vol_history[churn_vol_history["Mês Churn"] <= 3]) == 0
-        else ":red[**Sim**]"
-    )
+        with st.expander("Histórico de Churn INVOL - Últimos 24 meses"):
+            st.dataframe(churn.invol_history, hide_index=True)
 
-    churn_invol_history = add_df[
-        (add_df["Tipo Churn"] == "involuntario")
-        & (pd.to_datetime(add_df["Data - Retirada"]) >= max_date)
-    ]
-    churn_invol_history["Mês Churn"] = churn_invol_history["Mês Churn"].str.replace("M", "").astype(int)
+        # The loaded history is fresher than the summary view.
+        verdicts = {key: getattr(churn, key) for key in verdicts}
 
-    with st.expander("Histórico de Churn INVOL - Últimos 24 meses"):
-        st.dataframe(churn_invol_history, hide_index=True)
-
-    churn_invol_filter = (
-        ":green[**Não**]"
-        if len(churn_invol_history[churn_invol_history["Mês Churn"] <= 6]) == 0
-        else ":red[**Sim**]"
-    )
+    active_client = ":red[**Sim**]" if verdicts["active_client"] else ":green[**Não**]"
+    churn_vol_filter = ":red[**Sim**]" if verdicts["vol_churn_3m"] else ":green[**Não**]"
+    churn_invol_filter = ":red[**Sim**]" if verdicts["invol_churn_6m"] else ":green[**Não**]"
 
     vtal_data_columns = st.columns(3)
     with vtal_data_columns[0]:
@@ -287,6 +274,8 @@ def build_vtal_analysis(lead, *, db_engine) -> None:
         st.caption("Churn INVOL em até 6 meses")
         st.write(churn_invol_filter)
 
+    st.caption(f"{summary['hc_count']} HCs no endereço")
+
     create_decision_structure(
         "Resultado Análise Cliente V.Tal",
         "vtal_client",
@@ -301,13 +290,85 @@ def build_vtal_analysis(lead, *, db_engine) -> None:
     )
 
 
-@st.cache_data(show_spinner=False)
+VTAL_HISTORY_CACHE_SIZE = 2048
+VTAL_HISTORY_CACHE_TTL_SECONDS = 6 * 60 * 60
+VTAL_SUMMARY_CACHE_SIZE = 8192
+VTAL_SUMMARY_CACHE_TTL_SECONDS = 60 * 60
+
+
+@st.cache_resource
+def vtal_history_cache() -> LRUTTLCache:
+    """
+    Process-wide V.Tal history cache keyed by normalized (zip, number), shared by all sessions.
+    """
+    return LRUTTLCache(maxsize=VTAL_HISTORY_CACHE_SIZE, ttl_seconds=VTAL_HISTORY_CACHE_TTL_SECONDS)
+
+
+@st.cache_resource
+def vtal_summary_cache() -> LRUTTLCache:
+    """
+    Process-wide cache of the precomputed V.Tal verdicts, keyed like vtal_history_cache.
+    """
+    return LRUTTLCache(maxsize=VTAL_SUMMARY_CACHE_SIZE, ttl_seconds=VTAL_SUMMARY_CACHE_TTL_SECONDS)
+
+
+def _vtal_address_key(zip_code, number) -> tuple:
+    return (str(zip_code).strip(), str(number).strip())
+
+
 def fetch_vtal_history(address: dict) -> pd.DataFrame:
+    """
+    V.Tal history of an address (typed, see prepare_vtal_history), through the shared
+    cache (one query per address at a time). The frame is shared: do not modify it.
+    """
+    zip_code, number = _vtal_address_key(address.get("zipCode"), address.get("number"))
+
+    def load() -> pd.DataFrame:
+        db_engine = get_engine("local")
+        history = vtal_repo.fetch_vtal_history(db_engine, {"zipCode": zip_code, "number": number})
+        return prepare_vtal_history(history)
+
+    return vtal_history_cache().get_or_load((zip_code, number), load)
+
+
+def fetch_vtal_churn_summary(address: dict) -> dict:
+    """
+    Precomputed V.Tal verdicts of an address, through the shared cache.
+    """
+    key = _vtal_address_key(address.get("zipCode"), address.get("number"))
+
+    def load() -> dict:
+        db_engine = get_engine("local")
+        return vtal_repo.fetch_vtal_churn_summaries(db_engine, [key])[key]
+
+    return vtal_summary_cache().get_or_load(key, load)
+
+
+def prefetch_vtal_summaries(page_df: pd.DataFrame) -> None:
+    """
+    Warm the V.Tal verdicts of every lead address on the list page with one query.
+    """
+    if page_df is None or len(page_df) == 0 or "vtal_zip_code" not in page_df.columns:
+        return
+
+    cache = vtal_summary_cache()
+    addresses = page_df[["vtal_zip_code", "vtal_number"]].dropna()
+    missing = cache.missing(
+        dict.fromkeys(
+            _vtal_address_key(zip_code, number)
+            for zip_code, number in addresses.itertuples(index=False)
+        )
+    )
+    if not missing:
+        return
+
     db_engine = get_engine("local")
-    return vtal_repo.fetch_vtal_history(db_engine, address)
+    for key, summary in vtal_repo.fetch_vtal_churn_summaries(db_engine, missing).items():
+        cache.put(key, summary)
 
 
 def build_escavador_analysis(lead, *, db_engine) -> None:
+    court_case_decision = evaluate_lead_rules(lead)["court_case"]
     escavador_data_columns = st.columns(2)
 
     n_processos_reu = lead["active_cases_as_defendant"] if not pd.isna(lead["active_cases_as_defendant"]) else 0
@@ -323,16 +384,15 @@ def build_escavador_analysis(lead, *, db_engine) -> None:
         st.caption("Processos Criminais Ativos (como Réu)")
         st.write(str(n_processos_criminais))
 
-    if n_processos_criminais == 0:
-        if n_processos_reu <= 4:
+    if court_case_decision != "reprovado":
+        if court_case_decision == "aprovado":
             if lead["hzn_court_case_result"] != "aprovado":
                 st.success(
                     "Cliente **aprovado** na análise jurídica (< 5 _Processos Ativos_ como réu) - "
                     f"{fmt_date(date.today())}"
                 )
-                update_audit_step_features(
-                    db_engine=db_engine,
-                    lead_id=lead["lead_id"],
+                queue_audit_step_decision(
+                    lead=lead,
                     decision="aprovado",
                     field="court_case",
                 )
@@ -355,9 +415,8 @@ def build_escavador_analysis(lead, *, db_engine) -> None:
                 "Cliente **reprovado** na análise jurídica (> 1 _Processo Criminal_ ativo) - "
                 f"{fmt_date(date.today())}"
             )
-            update_audit_step_features(
-                db_engine=db_engine,
-                lead_id=lead["lead_id"],
+            queue_audit_step_decision(
+                lead=lead,
                 decision="reprovado",
                 field="court_case",
             )
@@ -380,6 +439,7 @@ def build_serasa_analysis(lead, *, db_engine) -> None:
     desc_dividas = dividas["pefinResponse"]
 
     score_serasa = int(lead["credit_score"]) if not pd.isna(lead["credit_score"]) else "—"
+    rules = evaluate_lead_rules(lead)
 
     serasa_data_columnns = st.columns(5)
     with serasa_data_columnns[0]:
@@ -415,13 +475,12 @@ def build_serasa_analysis(lead, *, db_engine) -> None:
             },
         )
 
-    if lead["statusregistration"] != "REGULAR":
+    if rules["serpro"] == "reprovado":
         st.write(":red[**Status do CPF reprovado (não _Regular_)**]")
 
         if lead["hzn_serpro_result"] != "reprovado":
-            update_audit_step_features(
-                db_engine=db_engine,
-                lead_id=lead["lead_id"],
+            queue_audit_step_decision(
+                lead=lead,
                 decision="reprovado",
                 field="serpro",
             )
@@ -430,22 +489,20 @@ def build_serasa_analysis(lead, *, db_engine) -> None:
         st.write(":green[Status do CPF **aprovado** (_Regular_)]")
 
         if lead["hzn_serpro_result"] != "aprovado":
-            update_audit_step_features(
-                db_engine=db_engine,
-                lead_id=lead["lead_id"],
+            queue_audit_step_decision(
+                lead=lead,
                 decision="aprovado",
                 field="serpro",
             )
 
-        if valor_total > 100:
+        if rules["serasa"] == "reprovado":
             if lead["hzn_serasa_result"] != "reprovado":
                 st.error(
                     "Cliente **reprovado** na análise Serasa (dívida > R$ 100,00) - "
                     f"{fmt_date(date.today())}"
                 )
-                update_audit_step_features(
-                    db_engine=db_engine,
-                    lead_id=lead["lead_id"],
+                queue_audit_step_decision(
+                    lead=lead,
                     decision="reprovado",
                     field="serasa",
                 )
@@ -455,15 +512,14 @@ def build_serasa_analysis(lead, *, db_engine) -> None:
                     f"{fmt_date(lead['hzn_serasa_dt'])}"
                 )
         else:
-            if score_serasa != "—" and score_serasa >= 450:
+            if rules["serasa"] == "aprovado":
                 if lead["hzn_serasa_result"] != "aprovado":
                     st.success(
                         "Cliente **aprovado** na análise Serasa - "
                         f"{fmt_date(date.today())}"
                     )
-                    update_audit_step_features(
-                        db_engine=db_engine,
-                        lead_id=lead["lead_id"],
+                    queue_audit_step_decision(
+                        lead=lead,
                         decision="aprovado",
                         field="serasa",
                     )
@@ -5,8 +5,7 @@ from typing import Iterable
 import pandas as pd
 import streamlit as st
 
-from core.state import bump_leads_version
-from db.repos import lead_repo
+from core.state import patch_leads_snapshot
 from services import audit_services
 
 
@@ -71,10 +70,12 @@ def create_decision_structure(
             }
 
             analysis_result = analysis_result_map.get(sel, "pendente")
-            lead_repo.update_audit_step(db_engine, lead_id, suffix, analysis_result)
-
-            bump_leads_version()
-            st.rerun()
+            update_audit_step_features(
+                db_engine=db_engine,
+                lead_id=lead_id,
+                decision=analysis_result,
+                field=suffix,
+            )
 
 
 def update_audit_step_features(
@@ -97,5 +98,50 @@ def update_audit_step_features(
         st.error(result.message)
         return
 
-    bump_leads_version()
+    patch_leads_snapshot(lead_id, result.values)
+    st.rerun()
+
+
+def queue_audit_step_decision(
+    *,
+    lead: dict,
+    decision: str,
+    field: str,
+) -> None:
+    """
+    Buffer an automatic step decision taken while rendering a lead.
+    Decisions equal to the lead's current value are dropped; the rest are
+    written together by flush_audit_step_decisions at the end of the run.
+    """
+    field = validate_audit_suffix(str(field))
+    if lead.get(f"hzn_{field}_result") == decision:
+        return
+
+    pending = st.session_state.setdefault("_pending_audit_steps", {})
+    pending.setdefault(lead["lead_id"], {})[field] = decision
+
+
+def flush_audit_step_decisions(*, db_engine) -> None:
+    """
+    Persist the buffered automatic decisions in one transaction, patch the
+    snapshot and rerun once.
+    """
+    pending = st.session_state.pop("_pending_audit_steps", None)
+    if not pending:
+        return
+
+    result = audit_services.set_audit_step_decisions(
+        db_engine,
+        decisions=pending,
+        valid_suffixes=AUDIT_SUFFIXES,
+    )
+
+    # A partial failure (missing leads) still committed the others: patch them first.
+    for lead_id, values in (result.values or {}).items():
+        patch_leads_snapshot(lead_id, values)
+
+    if not result.ok:
+        st.error(result.message)
+        return
+
     st.rerun()
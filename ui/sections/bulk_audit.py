@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+from datetime import date
+from typing import Callable
+
+import pandas as pd
+import streamlit as st
+
+from core.state import bump_leads_version
+from db.repos import outbox_repo
+from services import audit_services
+from ui.formatters import fmt_cpf, fmt_date
+
+
+DELIVERY_LABELS = {
+    "pending": "Pendente",
+    "sending": "Enviando",
+    "sent": "Enviado",
+    "failed": "Falha",
+    "superseded": "Substituído",
+}
+
+
+def build_bulk_audit_section(
+    *,
+    d_start: date,
+    d_end: date,
+    db_engine,
+    wake_sender: Callable[[], None],
+) -> None:
+    """
+    Approve at once every "Necessária auditoria" lead of the range the rules mark clean.
+    The AddSales submissions go through the outbox (delivered in the background).
+    """
+    with st.expander("Aprovação em lote - leads sem restrições", expanded=False):
+        st.caption(
+            "Leads em _Necessária auditoria_ aprovados nas regras automáticas "
+            "(Serpro, Serasa e Jurídico) e sem nenhuma etapa reprovada."
+        )
+
+        if st.button("Buscar leads", use_container_width=True, key="bulk_audit_search"):
+            candidates = audit_services.find_clean_auditable_leads(db_engine, d_start=d_start, d_end=d_end)
+            st.session_state["_bulk_audit_candidates"] = candidates.to_dict("records")
+            st.session_state["_bulk_audit_outcomes"] = None
+
+        candidates = st.session_state.get("_bulk_audit_candidates")
+        if candidates is not None:
+            _build_candidates(candidates, db_engine=db_engine, wake_sender=wake_sender)
+
+        outcomes = st.session_state.get("_bulk_audit_outcomes")
+        if outcomes:
+            _build_outcomes(outcomes, db_engine=db_engine)
+
+
+def _build_candidates(candidates: list, *, db_engine, wake_sender: Callable[[], None]) -> None:
+    if not candidates:
+        st.info("Nenhum lead sem restrições aguardando auditoria no período.")
+        return
+
+    st.dataframe(
+        pd.DataFrame(
+            {
+                "Nome": [lead["name"] for lead in candidates],
+                "CPF": [fmt_cpf(lead["cpf"]) for lead in candidates],
+                "Data": [fmt_date(lead["lead_dt"]) for lead in candidates],
+            }
+        ),
+        hide_index=True,
+    )
+
+    confirmed = st.checkbox(
+        f"Confirmo a aprovação dos {len(candidates)} leads acima",
+        key="bulk_audit_confirm",
+    )
+    if st.button(
+        f"✅ Aprovar {len(candidates)} leads",
+        use_container_width=True,
+        disabled=not confirmed,
+        key="bulk_audit_submit",
+    ):
+        results = audit_services.submit_final_audit_results(db_engine, leads=candidates, decision="aprovado")
+        wake_sender()
+
+        names = {str(lead["lead_id"]): lead["name"] for lead in candidates}
+        st.session_state["_bulk_audit_outcomes"] = [
+            {
+                "lead_id": lead_id,
+                "name": names.get(lead_id),
+                "ok": result.ok,
+                "skipped": result.skipped,
+                "message": result.message,
+            }
+            for lead_id, result in results.items()
+        ]
+        st.session_state["_bulk_audit_candidates"] = None
+        bump_leads_version()
+        st.rerun()
+
+
+def _outcome_label(outcome: dict) -> str:
+    if outcome["ok"]:
+        return "Aprovado"
+    if outcome["skipped"]:
+        return f"Ignorado: {outcome['message']}"
+    return f"Erro: {outcome['message']}"
+
+
+def _build_outcomes(outcomes: list, *, db_engine) -> None:
+    approved = sum(outcome["ok"] for outcome in outcomes)
+    skipped = sum(outcome["skipped"] for outcome in outcomes)
+    st.success(f"{approved} de {len(outcomes)} leads aprovados.")
+    if skipped:
+        st.warning(
+            f"{skipped} leads ignorados: já auditados por outra pessoa (ou removidos) "
+            "desde a busca. A decisão deles não foi alterada."
+        )
+
+    # Skipped leads' submissions (if any) belong to someone else's decision.
+    states = outbox_repo.fetch_delivery_states(
+        db_engine, [outcome["lead_id"] for outcome in outcomes if outcome["ok"]]
+    )
+
+    st.dataframe(
+        pd.DataFrame(
+            {
+                "Lead": [outcome["name"] for outcome in outcomes],
+                "Auditoria": [_outcome_label(outcome) for outcome in outcomes],
+                "AddSales": [
+                    DELIVERY_LABELS.get(states[outcome["lead_id"]]["status"], states[outcome["lead_id"]]["status"])
+                    if outcome["lead_id"] in states
+                    else "—"
+                    for outcome in outcomes
+                ],
+                "Erro de envio": [
+                    (states.get(outcome["lead_id"]) or {}).get("last_error") or ""
+                    for outcome in outcomes
+                ],
+            }
+        ),
+        hide_index=True,
+    )
+
+    if st.button("Atualizar status de envio", use_container_width=True, key="bulk_audit_refresh"):
+        st.rerun()
@@ -1,61 +1,40 @@
 from __future__ import annotations
 
-from datetime import datetime
-
 import pandas as pd
 import streamlit as st
 
+from services.serasa_history_service import parse_registered_history
 
-def build_tabela_enderecos(descricao_enderecos):
-    if descricao_enderecos == "{}":
-        st.error("Não há registro de endereços ligados à este CPF")
-        return None
 
-    info_enderecos = descricao_enderecos.replace("{", "").replace("}", "")
-    info_enderecos = info_enderecos.split('","')
-    info_enderecos = [e.replace('"', "").replace("\\", "") for e in info_enderecos]
+@st.cache_data(show_spinner=False, max_entries=256)
+def _registered_history(raw, value_column: str) -> pd.DataFrame:
+    return parse_registered_history(raw, value_column)
 
-    enderecos = []
-    register_data = []
 
-    for desc in info_enderecos:
-        endereco, reg_data = desc.replace("(", "").replace(")", "").split(",")
+def _fmt_history_dates(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.copy()
+    df["Data de registro"] = df["Data de registro"].dt.strftime("%d de %B de %Y")
+    return df
 
-        enderecos.append(endereco)
-        register_data.append(datetime.strptime(reg_data, "%Y-%m-%d"))
 
-    address_history_df = pd.DataFrame({"Endereço registrado": enderecos, "Data de registro": register_data})
-    address_history_df = address_history_df.sort_values(by="Data de registro", ascending=False)
-    address_history_df["Data de registro"] = address_history_df["Data de registro"].dt.strftime("%d de %B de %Y")
-    address_history_df.index = address_history_df.index + 1
+def build_tabela_enderecos(descricao_enderecos):
+    address_history_df = _registered_history(descricao_enderecos, "Endereço registrado")
+    if address_history_df.empty:
+        st.error("Não há registro de endereços ligados à este CPF")
+        return None
 
-    return address_history_df
+    return _fmt_history_dates(address_history_df)
 
 
 def build_tabela_telefones(phone_data_string):
-    if phone_data_string == "{}":
+    phone_history_df = _registered_history(phone_data_string, "Número registrado")
+    if phone_history_df.empty:
         st.error("Não há registro de telefones ligados à este CPF")
         return None
 
-    phone_data_string_fmt = phone_data_string.replace("{", "").replace("}", "")
-    all_phone_data = phone_data_string_fmt.split('","')
-    all_phone_data = [p.replace('"', "") for p in all_phone_data]
-
-    phones = []
-    register_data = []
-
-    for phone_data in all_phone_data:
-        phone, reg_data = phone_data.replace("(", "").replace(")", "").split(",")
-        phone = f"({phone[:2]}) {phone[2:]}"
-
-        phones.append(phone)
-        register_data.append(datetime.strptime(reg_data, "%Y-%m-%d"))
-
-    phone_history_df = pd.DataFrame({"Número registrado": phones, "Data de registro": register_data})
-    phone_history_df = phone_history_df.sort_values(by="Data de registro", ascending=False)
-    phone_history_df["Data de registro"] = phone_history_df["Data de registro"].dt.strftime("%d de %B de %Y")
-    phone_history_df.index = phone_history_df.index + 1
-
+    phone_history_df = _fmt_history_dates(phone_history_df)
+    phones = phone_history_df["Número registrado"].fillna("").astype(str)
+    phone_history_df["Número registrado"] = "(" + phones.str[:2] + ") " + phones.str[2:]
     return phone_history_df
 
 